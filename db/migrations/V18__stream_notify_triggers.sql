@@ -0,0 +1,39 @@
+-- Real-time stream notifications
+-- Replaces the SSE polling loop with LISTEN/NOTIFY: every insert signals the
+-- matching channel so the API only queries when there is something new.
+
+-- ============================================
+-- 1. NOTIFY FUNCTION
+-- ============================================
+
+-- The payload is intentionally empty: identical notifications raised inside
+-- one transaction are folded into a single event by PostgreSQL, so a COPY of
+-- thousands of transactions wakes listeners once. Listeners fetch everything
+-- after their last seen id anyway.
+CREATE OR REPLACE FUNCTION notify_stream_channel()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify(TG_ARGV[0], '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- 2. TRANSACTIONS
+-- ============================================
+
+DROP TRIGGER IF EXISTS trg_transactions_notify ON transactions;
+CREATE TRIGGER trg_transactions_notify
+    AFTER INSERT ON transactions
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_stream_channel('new_transaction');
+
+-- ============================================
+-- 3. ALERTS
+-- ============================================
+
+DROP TRIGGER IF EXISTS trg_alerts_notify ON alerts;
+CREATE TRIGGER trg_alerts_notify
+    AFTER INSERT ON alerts
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_stream_channel('new_alert');
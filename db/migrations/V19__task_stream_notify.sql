@@ -0,0 +1,9 @@
+-- Real-time task stream notifications
+-- Tasks are updated in place, so the task SSE stream listens for inserts and
+-- updates instead of polling tasks.updated_at every second.
+
+DROP TRIGGER IF EXISTS trg_tasks_notify ON tasks;
+CREATE TRIGGER trg_tasks_notify
+    AFTER INSERT OR UPDATE ON tasks
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_stream_channel('task_updated');
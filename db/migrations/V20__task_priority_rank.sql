@@ -0,0 +1,18 @@
+-- Task queue ordering
+-- list_tasks sorts by priority rank, then due date, then newest first. The
+-- rank used to be a CASE expression in the ORDER BY, which no index could
+-- serve. Persist it as a generated column and index the full sort key so the
+-- top-N task list is read in index order.
+
+ALTER TABLE tasks
+    ADD COLUMN IF NOT EXISTS priority_rank SMALLINT GENERATED ALWAYS AS (
+        CASE priority
+            WHEN 'critical' THEN 1
+            WHEN 'high' THEN 2
+            WHEN 'medium' THEN 3
+            ELSE 4
+        END
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_priority_rank_due
+    ON tasks (priority_rank, due_date ASC NULLS LAST, created_at DESC);
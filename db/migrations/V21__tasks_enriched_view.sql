@@ -0,0 +1,18 @@
+-- Enriched task view
+-- One definition of the task + customer/alert/user-name join shared by the
+-- task list, task detail and task stream queries.
+
+CREATE OR REPLACE VIEW tasks_enriched AS
+SELECT
+    t.*,
+    COALESCE(c.first_name || ' ' || c.last_name, c.full_name) AS customer_name,
+    c.risk_level AS customer_risk_level,
+    a.scenario AS alert_scenario,
+    a.severity AS alert_severity,
+    u_assigned.full_name AS assigned_to_name,
+    u_claimed.full_name AS claimed_by_name
+FROM tasks t
+LEFT JOIN customers c ON c.id = t.customer_id
+LEFT JOIN alerts a ON a.id = t.alert_id
+LEFT JOIN users u_assigned ON u_assigned.id = t.assigned_to
+LEFT JOIN users u_claimed ON u_claimed.id = t.claimed_by_id;
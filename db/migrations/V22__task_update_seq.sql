@@ -0,0 +1,56 @@
+-- Task change sequence
+-- The task stream paged on updated_at, which is not unique: rows updated in
+-- the same transaction share a timestamp and could be skipped at a batch
+-- boundary. update_seq is a strictly increasing counter bumped on every
+-- insert and update, giving the stream an exact keyset cursor.
+
+-- ============================================
+-- 1. COLUMN
+-- ============================================
+
+CREATE SEQUENCE IF NOT EXISTS tasks_update_seq;
+
+ALTER TABLE tasks
+    ADD COLUMN IF NOT EXISTS update_seq BIGINT NOT NULL DEFAULT nextval('tasks_update_seq');
+
+CREATE INDEX IF NOT EXISTS idx_tasks_update_seq ON tasks (update_seq);
+
+-- ============================================
+-- 2. TRIGGER
+-- ============================================
+
+CREATE OR REPLACE FUNCTION bump_task_update_seq()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.update_seq = nextval('tasks_update_seq');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_tasks_update_seq ON tasks;
+CREATE TRIGGER trg_tasks_update_seq
+    BEFORE UPDATE ON tasks
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_task_update_seq();
+
+-- ============================================
+-- 3. VIEW
+-- ============================================
+
+-- tasks_enriched expands t.* at creation time; rebuild it to pick up the new
+-- column (CREATE OR REPLACE cannot insert a column before the joined ones)
+DROP VIEW IF EXISTS tasks_enriched;
+CREATE VIEW tasks_enriched AS
+SELECT
+    t.*,
+    COALESCE(c.first_name || ' ' || c.last_name, c.full_name) AS customer_name,
+    c.risk_level AS customer_risk_level,
+    a.scenario AS alert_scenario,
+    a.severity AS alert_severity,
+    u_assigned.full_name AS assigned_to_name,
+    u_claimed.full_name AS claimed_by_name
+FROM tasks t
+LEFT JOIN customers c ON c.id = t.customer_id
+LEFT JOIN alerts a ON a.id = t.alert_id
+LEFT JOIN users u_assigned ON u_assigned.id = t.assigned_to
+LEFT JOIN users u_claimed ON u_claimed.id = t.claimed_by_id;
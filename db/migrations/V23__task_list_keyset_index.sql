@@ -0,0 +1,14 @@
+-- Keyset pagination for the task list
+-- list_tasks now pages on (priority_rank, due_date, created_at, id) with an
+-- "after" cursor. id breaks ties between tasks created in one transaction, so
+-- it joins the sort key index. Most reads are of the open work queue, which
+-- also gets a partial index over the same key.
+
+DROP INDEX IF EXISTS idx_tasks_priority_rank_due;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_priority_rank_due_id
+    ON tasks (priority_rank, due_date ASC NULLS LAST, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_tasks_open_queue
+    ON tasks (priority_rank, due_date ASC NULLS LAST, created_at DESC, id DESC)
+    WHERE status IN ('pending', 'in_progress');
@@ -0,0 +1,74 @@
+-- Denormalized alert fields on tasks
+-- tasks_enriched joined alerts on every task read. alerts is a hypertable keyed
+-- by (id, created_at), so a lookup by id alone probes every chunk. An alert's
+-- scenario and severity never change after insert, so copy them onto the task
+-- when it is created (or re-linked) and drop the join. Customer and user names
+-- are mutable and stay as primary-key joins.
+
+-- ============================================
+-- 1. COLUMNS
+-- ============================================
+
+ALTER TABLE tasks
+    ADD COLUMN IF NOT EXISTS alert_scenario TEXT,
+    ADD COLUMN IF NOT EXISTS alert_severity TEXT;
+
+-- ============================================
+-- 2. TRIGGER
+-- ============================================
+
+CREATE OR REPLACE FUNCTION set_task_alert_fields()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.alert_id IS NULL THEN
+        NEW.alert_scenario = NULL;
+        NEW.alert_severity = NULL;
+    ELSE
+        SELECT a.scenario, a.severity
+        INTO NEW.alert_scenario, NEW.alert_severity
+        FROM alerts a
+        WHERE a.id = NEW.alert_id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_tasks_alert_fields ON tasks;
+CREATE TRIGGER trg_tasks_alert_fields
+    BEFORE INSERT OR UPDATE OF alert_id ON tasks
+    FOR EACH ROW
+    EXECUTE FUNCTION set_task_alert_fields();
+
+-- ============================================
+-- 3. BACKFILL
+-- ============================================
+
+-- Skip the user triggers (updated_at, history, stream notify, update_seq):
+-- this is not a change to the tasks themselves
+ALTER TABLE tasks DISABLE TRIGGER USER;
+
+UPDATE tasks t
+SET alert_scenario = a.scenario,
+    alert_severity = a.severity
+FROM alerts a
+WHERE a.id = t.alert_id;
+
+ALTER TABLE tasks ENABLE TRIGGER USER;
+
+-- ============================================
+-- 4. VIEW
+-- ============================================
+
+-- The alert fields now come from t.*
+DROP VIEW IF EXISTS tasks_enriched;
+CREATE VIEW tasks_enriched AS
+SELECT
+    t.*,
+    COALESCE(c.first_name || ' ' || c.last_name, c.full_name) AS customer_name,
+    c.risk_level AS customer_risk_level,
+    u_assigned.full_name AS assigned_to_name,
+    u_claimed.full_name AS claimed_by_name
+FROM tasks t
+LEFT JOIN customers c ON c.id = t.customer_id
+LEFT JOIN users u_assigned ON u_assigned.id = t.assigned_to
+LEFT JOIN users u_claimed ON u_claimed.id = t.claimed_by_id;
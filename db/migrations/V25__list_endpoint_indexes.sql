@@ -0,0 +1,45 @@
+-- Composite indexes for the list endpoints
+-- Every list filters on one column and orders by created_at DESC with a
+-- LIMIT. Indexing (filter, created_at DESC) lets Postgres walk the index in
+-- order and stop at the limit, with no sort. The single-column indexes these
+-- replace are prefixes of the new ones and would only add write cost.
+
+-- Alerts: GET /alerts filters on status, assigned_to or customer_id
+DROP INDEX IF EXISTS idx_alerts_status;
+DROP INDEX IF EXISTS idx_alerts_assigned_to;
+
+CREATE INDEX IF NOT EXISTS idx_alerts_status_created
+    ON alerts (status, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_alerts_assigned_to_created
+    ON alerts (assigned_to, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_alerts_customer_created
+    ON alerts (customer_id, created_at DESC);
+
+-- Customers: GET /customers orders by created_at and filters on status or
+-- risk_level
+DROP INDEX IF EXISTS idx_customers_status;
+
+CREATE INDEX IF NOT EXISTS idx_customers_created_at
+    ON customers (created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_customers_status_created
+    ON customers (status, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_customers_risk_level_created
+    ON customers (risk_level, created_at DESC);
+
+-- Per-task lists: attachments, notes and status history, newest first
+DROP INDEX IF EXISTS idx_task_attachments_task_id;
+DROP INDEX IF EXISTS idx_task_notes_task_id;
+DROP INDEX IF EXISTS idx_task_status_history_task_id;
+
+CREATE INDEX IF NOT EXISTS idx_task_attachments_task_created
+    ON task_attachments (task_id, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_task_notes_task_created
+    ON task_notes (task_id, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_task_status_history_task_created
+    ON task_status_history (task_id, created_at DESC);
@@ -0,0 +1,65 @@
+-- Task stream commit-order cursor
+-- V22 described update_seq as an exact keyset cursor for the task stream. It
+-- is not: nextval() runs when a row is written, not when its transaction
+-- commits. A transaction that takes seq 5 and commits after another one that
+-- took seq 6 is skipped once the stream has moved past 6.
+--
+-- Each task row now also records the id of the transaction that last wrote
+-- it. The stream only reads rows written by transactions older than the
+-- oldest one still running (the snapshot xmin), so every row it passes is
+-- already committed, and anything committed later has a higher transaction id
+-- than the cursor. Rows are ordered by (update_xid, update_seq); update_seq
+-- only breaks ties between rows of the same transaction.
+--
+-- The snapshot xmin is cluster-wide, not per database: it is the oldest
+-- transaction still running anywhere on this Postgres server. Temporal's
+-- persistence (POSTGRES_SEEDS=timescaledb), the TimescaleDB continuous
+-- aggregate refresh jobs and the COPY consumer all share the cluster, so a
+-- long-running write transaction in any of them, even one that never touches
+-- tasks, holds the task stream back until it finishes.
+
+-- ============================================
+-- 1. COLUMN
+-- ============================================
+
+ALTER TABLE tasks
+    ADD COLUMN IF NOT EXISTS update_xid BIGINT NOT NULL DEFAULT txid_current();
+
+-- The stream no longer pages on update_seq alone
+DROP INDEX IF EXISTS idx_tasks_update_seq;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_update_xid_seq
+    ON tasks (update_xid, update_seq);
+
+-- ============================================
+-- 2. TRIGGER
+-- ============================================
+
+-- trg_tasks_update_seq (V22) already runs this before every update; inserts
+-- take both values from the column defaults
+CREATE OR REPLACE FUNCTION bump_task_update_seq()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.update_seq = nextval('tasks_update_seq');
+    NEW.update_xid = txid_current();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- 3. VIEW
+-- ============================================
+
+-- Rebuild tasks_enriched so t.* picks up the new column
+DROP VIEW IF EXISTS tasks_enriched;
+CREATE VIEW tasks_enriched AS
+SELECT
+    t.*,
+    COALESCE(c.first_name || ' ' || c.last_name, c.full_name) AS customer_name,
+    c.risk_level AS customer_risk_level,
+    u_assigned.full_name AS assigned_to_name,
+    u_claimed.full_name AS claimed_by_name
+FROM tasks t
+LEFT JOIN customers c ON c.id = t.customer_id
+LEFT JOIN users u_assigned ON u_assigned.id = t.assigned_to
+LEFT JOIN users u_claimed ON u_claimed.id = t.claimed_by_id;
@@ -0,0 +1,41 @@
+-- Direct-to-S3 attachment uploads
+-- /attachments/confirm recorded any object found under tasks/{id}/, so a
+-- proxy-uploaded key, or one key confirmed twice, produced several rows for
+-- a single object; deleting one of them removed the object behind the others.
+--
+-- Every presigned POST now leaves a pending upload row, and confirming
+-- consumes it. A key can only be recorded once. The presigned POST stays
+-- usable until it expires, so the object can still be replaced after the
+-- confirm; upload_expires_at on the attachment tells the download path when
+-- the key alone identifies the content again.
+
+-- ============================================
+-- 1. PENDING UPLOADS
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS task_attachment_uploads (
+    file_path TEXT PRIMARY KEY,
+    task_id BIGINT NOT NULL REFERENCES tasks(id) ON DELETE CASCADE,
+    expires_at TIMESTAMPTZ NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_task_attachment_uploads_task_expires
+    ON task_attachment_uploads (task_id, expires_at);
+
+-- ============================================
+-- 2. ATTACHMENTS
+-- ============================================
+
+-- NULL for uploads proxied through the API, which S3 never accepts again
+ALTER TABLE task_attachments
+    ADD COLUMN IF NOT EXISTS upload_expires_at TIMESTAMPTZ;
+
+-- Keep the oldest row of any key recorded more than once
+DELETE FROM task_attachments a
+USING task_attachments b
+WHERE a.file_path = b.file_path
+  AND a.id > b.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_task_attachments_file_path
+    ON task_attachments (file_path);
@@ -2515,7 +2515,7 @@ function renderTasks() {
             ${t.status === 'in_progress' && isMyTask(t) ? `
               <button class="btn ghost" onclick="releaseTask(${t.id})">Release</button>
               <button class="btn primary" onclick="completeTaskPrompt(${t.id})">Complete</button>
-              ${!t.workflow_id ? `<button class="btn ghost" onclick="startTaskWorkflow(${t.id})">Start Workflow</button>` : ''}
+              ${!t.workflow_run_id ? `<button class="btn ghost" onclick="startTaskWorkflow(${t.id})">Start Workflow</button>` : ''}
             ` : ''}
           </div>
         </div>
@@ -5949,7 +5949,7 @@ async function viewTaskDetail(taskId) {
       statusActions.push(`<button class="btn primary" onclick="showAssignTaskModal(${task.id})">Assign</button>`);
     } else if (task.status === 'in_progress' && isMyTask) {
       statusActions.push(`<button class="btn ghost" onclick="releaseTask(${task.id})">Release</button>`);
-      if (!task.workflow_id) {
+      if (!task.workflow_run_id) {
         statusActions.push(`<button class="btn ghost" onclick="startTaskWorkflow(${task.id})">Start Workflow</button>`);
       }
       statusActions.push(`<button class="btn primary" onclick="completeTaskPrompt(${task.id})">Complete Task</button>`);
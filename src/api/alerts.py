@@ -3,13 +3,16 @@ Alert Lifecycle API Router
 
 All status changes go through Temporal workflows for full audit/orchestration.
 """
+import asyncio
 import logging
-from io import BytesIO
+import os
 from typing import Any, Optional
 from uuid import UUID, uuid4
 
 from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from psycopg import AsyncConnection
 from psycopg.rows import dict_row
 from temporalio.client import Client
@@ -18,7 +21,9 @@ from src.api.config import settings
 from src.api.db import get_pool
 from src.api.models import (
     ALERT_STATUSES,
+    ALERT_STATUSES_SET,
     RESOLUTION_TYPES,
+    RESOLUTION_TYPES_SET,
     AlertAssign,
     AlertEscalate,
     AlertHold,
@@ -26,15 +31,21 @@ from src.api.models import (
     AlertReopen,
     AlertResolve,
 )
-from src.api.s3 import delete_file, download_file, upload_file
+from src.api.s3 import delete_file, open_file, upload_fileobj
 from src.workflows.worker import AlertLifecycleWorkflow
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/alerts", tags=["alerts"])
 
-# Temporal client singleton
+# Validation messages are fixed, so build them once
+INVALID_ALERT_STATUS = f"Invalid status. Must be one of: {ALERT_STATUSES}"
+INVALID_RESOLUTION_TYPE = f"Invalid resolution_type. Must be one of: {RESOLUTION_TYPES}"
+
+# Temporal client singleton; the lock keeps concurrent first callers from
+# each opening a connection
 _temporal_client: Optional[Client] = None
+_temporal_lock = asyncio.Lock()
 
 
 # =============================================================================
@@ -68,7 +79,9 @@ async def get_temporal_client() -> Client:
     """Get or create Temporal client singleton"""
     global _temporal_client
     if _temporal_client is None:
-        _temporal_client = await Client.connect(f"{settings.temporal_host}:{settings.temporal_port}")
+        async with _temporal_lock:
+            if _temporal_client is None:
+                _temporal_client = await Client.connect(f"{settings.temporal_host}:{settings.temporal_port}")
     return _temporal_client
 
 
@@ -118,8 +131,8 @@ async def list_alerts(
     params = []
 
     if status:
-        if status not in ALERT_STATUSES:
-            raise HTTPException(400, f"Invalid status. Must be one of: {ALERT_STATUSES}")
+        if status not in ALERT_STATUSES_SET:
+            raise HTTPException(400, INVALID_ALERT_STATUS)
         conditions.append("a.status = %s")
         params.append(status)
 
@@ -300,8 +313,8 @@ async def resolve_alert(
     current_user_role: str = Query("analyst", description="Current user role"),
 ):
     """Resolve an alert with a resolution type"""
-    if body.resolution_type not in RESOLUTION_TYPES:
-        raise HTTPException(400, f"Invalid resolution_type. Must be one of: {RESOLUTION_TYPES}")
+    if body.resolution_type not in RESOLUTION_TYPES_SET:
+        raise HTTPException(400, INVALID_RESOLUTION_TYPE)
 
     params = {
         "resolution_type": body.resolution_type,
@@ -460,19 +473,25 @@ async def upload_alert_attachment(
     current_user_id: UUID = Query(..., description="Current user ID"),
 ):
     """Upload an attachment to an alert"""
-    # Validate file size (10MB max)
-    content = await file.read()
-    if len(content) > 10 * 1024 * 1024:
+    # Validate file size (10MB max) without reading the upload into memory;
+    # it is already spooled by Starlette and streamed to S3 from there
+    file_size = file.size
+    if file_size is None:
+        file.file.seek(0, os.SEEK_END)
+        file_size = file.file.tell()
+    if file_size > 10 * 1024 * 1024:
         raise HTTPException(400, "File too large. Maximum size is 10MB.")
+    file.file.seek(0)
 
     # Generate unique filename
     file_ext = file.filename.split(".")[-1] if "." in file.filename else ""
     unique_filename = f"{uuid4().hex}.{file_ext}" if file_ext else uuid4().hex
     s3_key = f"alerts/{alert_id}/{unique_filename}"
 
-    # Upload to S3
-    upload_file(
-        content=content,
+    # Upload to S3 (boto3 is blocking; keep it off the event loop)
+    await run_in_threadpool(
+        upload_fileobj,
+        file.file,
         key=s3_key,
         content_type=file.content_type or "application/octet-stream",
         metadata={"original_filename": file.filename, "alert_id": str(alert_id)},
@@ -487,7 +506,7 @@ async def upload_alert_attachment(
             VALUES (%s, %s, %s, %s, %s, %s, %s)
             RETURNING id, created_at
             """,
-            (alert_id, str(current_user_id), unique_filename, file.filename, s3_key, len(content), file.content_type),
+            (alert_id, str(current_user_id), unique_filename, file.filename, s3_key, file_size, file.content_type),
         )
         result = await cur.fetchone()
 
@@ -495,7 +514,7 @@ async def upload_alert_attachment(
         "success": True,
         "attachment_id": result["id"],
         "filename": file.filename,
-        "file_size": len(content),
+        "file_size": file_size,
         "created_at": result["created_at"].isoformat(),
     }
 
@@ -514,13 +533,18 @@ async def download_alert_attachment(alert_id: int, attachment_id: int):
         if not row:
             raise HTTPException(404, "Attachment not found")
 
-    # Download from S3
-    content, content_type, _ = download_file(row["file_path"])
+    # Stream from S3 in chunks instead of buffering the whole object
+    obj = await run_in_threadpool(open_file, row["file_path"])
+    body = obj["Body"]
 
     return StreamingResponse(
-        BytesIO(content),
-        media_type=content_type,
-        headers={"Content-Disposition": f'attachment; filename="{row["original_filename"]}"'},
+        body.iter_chunks(64 * 1024),
+        media_type=obj.get("ContentType", "application/octet-stream"),
+        headers={
+            "Content-Disposition": f'attachment; filename="{row["original_filename"]}"',
+            "Content-Length": str(obj["ContentLength"]),
+        },
+        background=BackgroundTask(body.close),
     )
 
 
@@ -539,7 +563,7 @@ async def delete_alert_attachment(alert_id: int, attachment_id: int):
             raise HTTPException(404, "Attachment not found")
 
         # Delete from S3
-        delete_file(row["file_path"])
+        await run_in_threadpool(delete_file, row["file_path"])
 
         # Delete from database
         await cur.execute(
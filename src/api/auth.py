@@ -6,6 +6,7 @@ from typing import Optional
 from uuid import uuid4
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from psycopg import AsyncConnection
 from psycopg.rows import dict_row
 from pydantic import BaseModel, EmailStr
@@ -79,6 +80,7 @@ async def login(
             WHERE email = %s
             """,
             (body.email,),
+            prepare=True,
         )
         user = await cur.fetchone()
 
@@ -103,8 +105,9 @@ async def login(
             detail="Account is disabled. Contact administrator.",
         )
 
-    # Verify password
-    if not verify_password(body.password, user["password_hash"]):
+    # Verify password; bcrypt is deliberately slow, so it runs in the
+    # threadpool instead of blocking the event loop
+    if not await run_in_threadpool(verify_password, body.password, user["password_hash"]):
         # Increment failed attempts
         failed_attempts = user["failed_attempts"] + 1
         locked_until = None
@@ -214,6 +217,7 @@ async def refresh_token(
             WHERE rt.id = %s AND rt.token_hash = %s
             """,
             (token_id, token_hash),
+            prepare=True,
         )
         token_record = await cur.fetchone()
 
@@ -335,14 +339,14 @@ async def change_password(
         )
         user_record = await cur.fetchone()
 
-    if not verify_password(body.current_password, user_record["password_hash"]):
+    if not await run_in_threadpool(verify_password, body.current_password, user_record["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Current password is incorrect",
         )
 
     # Update password
-    new_hash = hash_password(body.new_password)
+    new_hash = await run_in_threadpool(hash_password, body.new_password)
 
     async with conn.cursor() as cur:
         await cur.execute(
@@ -10,6 +10,20 @@ class Settings(BaseModel):
     database_name: str = os.getenv("DATABASE_NAME", "aml")
     database_user: str = os.getenv("DATABASE_USER", "aml_user")
     database_password: str = os.getenv("DATABASE_PASSWORD", "aml_pass")
+    # The request pool may go through PgBouncer (transaction pooling); LISTEN
+    # connections for the streams always use database_host directly
+    database_pool_host: str = os.getenv("DATABASE_POOL_HOST", os.getenv("DATABASE_HOST", "localhost"))
+    database_pool_port: int = int(os.getenv("DATABASE_POOL_PORT", os.getenv("DATABASE_PORT", "5432")))
+    database_pool_min_size: int = int(os.getenv("DATABASE_POOL_MIN_SIZE", "5"))
+    database_pool_max_size: int = int(os.getenv("DATABASE_POOL_MAX_SIZE", "20"))
+    # Seconds a request waits for a pooled connection before failing
+    database_pool_timeout: float = float(os.getenv("DATABASE_POOL_TIMEOUT", "10"))
+    # Connections above min_size are closed after this many idle seconds, and
+    # every connection is replaced after max_lifetime (bounds server memory)
+    database_pool_max_idle: float = float(os.getenv("DATABASE_POOL_MAX_IDLE", "300"))
+    database_pool_max_lifetime: float = float(os.getenv("DATABASE_POOL_MAX_LIFETIME", "3600"))
+    # Executions of a query text before psycopg prepares it server-side
+    database_prepare_threshold: int = int(os.getenv("DATABASE_PREPARE_THRESHOLD", "5"))
 
     # NATS
     nats_url: str = os.getenv("NATS_URL", "nats://localhost:4222")
@@ -26,6 +40,7 @@ class Settings(BaseModel):
 
     # Security
     password_min_length: int = 8
+    bcrypt_cost: int = int(os.getenv("BCRYPT_COST", "12"))
     max_failed_attempts: int = 5
     lockout_minutes: int = 15
 
@@ -7,24 +7,48 @@ from .config import settings
 pool: AsyncConnectionPool | None = None
 
 
+def get_dsn() -> str:
+    return (
+        f"postgresql://{settings.database_user}:"
+        f"{settings.database_password}@"
+        f"{settings.database_host}:{settings.database_port}/"
+        f"{settings.database_name}"
+    )
+
+
+def get_pool_dsn() -> str:
+    """DSN for the request pool, which may point at PgBouncer"""
+    return (
+        f"postgresql://{settings.database_user}:"
+        f"{settings.database_password}@"
+        f"{settings.database_pool_host}:{settings.database_pool_port}/"
+        f"{settings.database_name}"
+    )
+
+
 def get_pool() -> AsyncConnectionPool:
     global pool
     if pool is None:
-        dsn = (
-            f"postgresql://{settings.database_user}:"
-            f"{settings.database_password}@"
-            f"{settings.database_host}:{settings.database_port}/"
-            f"{settings.database_name}"
-        )
         pool = AsyncConnectionPool(
-            dsn,
-            min_size=1,
-            max_size=10,
-            timeout=10,
+            get_pool_dsn(),
+            min_size=settings.database_pool_min_size,
+            max_size=settings.database_pool_max_size,
+            timeout=settings.database_pool_timeout,
+            max_idle=settings.database_pool_max_idle,
+            max_lifetime=settings.database_pool_max_lifetime,
+            kwargs={"prepare_threshold": settings.database_prepare_threshold},
+            # Validate idle connections before handing them out, so a
+            # connection dropped by the server never reaches a request
+            check=AsyncConnectionPool.check_connection,
         )
     return pool
 
 
+async def open_pool() -> None:
+    """Open the pool and wait until min_size connections are established"""
+    await get_pool().open(wait=True)
+
+
 async def connection() -> AsyncIterator:
     async with get_pool().connection() as conn:
         yield conn
@@ -13,15 +13,14 @@ logging.basicConfig(
 )
 from fastapi import Depends, FastAPI, HTTPException, Query, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from psycopg import AsyncConnection
 from psycopg.rows import dict_row
-from psycopg.types.json import Jsonb
+from pydantic import TypeAdapter
 
 from temporalio.client import Client as TemporalClient
 
-from .config import settings
-from .db import connection, get_pool
+from .db import connection, get_pool, open_pool
 from .events import publish_event, connect_jetstream, close_jetstream
 from .models import (
     AlertDefinition,
@@ -35,13 +34,27 @@ from .models import (
 )
 from .risk import calculate_risk
 from .auth import router as auth_router
-from .streaming import router as streaming_router
+from .streaming import router as streaming_router, stop_stream_hubs
 from .tasks import router as tasks_router, definition_router as task_definitions_router
 from .users import router as users_router
-from .alerts import router as alerts_router
+from .alerts import get_temporal_client, router as alerts_router
 from .ai_assistant import router as ai_router
+from src.workflows.worker import (
+    InvestigationWorkflow,
+    KycRefreshWorkflow,
+    SanctionsScreeningWorkflow,
+)
+
+# List endpoints validate whole result sets in one call instead of one
+# model instance per row
+ALERT_DEFINITION_LIST_ADAPTER = TypeAdapter(list[AlertDefinition])
 
-app = FastAPI(title="AML Compliance MVP", version="0.1.0")
+# orjson renders response bodies several times faster than stdlib json
+app = FastAPI(
+    title="AML Compliance MVP",
+    version="0.1.0",
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -79,17 +92,16 @@ async def startup_event() -> None:
     """Initialize connections on startup"""
     global temporal_client
 
-    # Initialize database pool
-    get_pool()
+    # Initialize database pool, warm before serving requests
+    await open_pool()
 
     # Initialize JetStream connection
     await connect_jetstream()
 
-    # Initialize Temporal client
+    # Initialize Temporal client, shared with the alert lifecycle endpoints so
+    # no request pays for the connection
     try:
-        temporal_client = await TemporalClient.connect(
-            f"{settings.temporal_host}:{settings.temporal_port}"
-        )
+        temporal_client = await get_temporal_client()
         logging.info("Connected to Temporal server")
     except Exception as e:
         logging.error(f"Failed to connect to Temporal: {e}")
@@ -98,6 +110,9 @@ async def startup_event() -> None:
 @app.on_event("shutdown")
 async def shutdown_event() -> None:
     """Gracefully close connections on shutdown"""
+    # Stop SSE stream listeners
+    await stop_stream_hubs()
+
     # Close JetStream connection
     await close_jetstream()
 
@@ -115,6 +130,32 @@ async def health() -> dict:
     return {"status": "ok", "timestamp": datetime.utcnow()}
 
 
+@app.get("/healthz")
+async def healthz() -> ORJSONResponse:
+    """Readiness probe: the pool can hand out a working connection"""
+    pool = get_pool()
+    try:
+        async with pool.connection(timeout=2) as conn:
+            await conn.execute("SELECT 1")
+    except Exception as e:
+        # Driver errors can name the host, user and database; keep them in
+        # the log rather than in this unauthenticated response
+        logging.error(f"Health check failed: {e}")
+        return ORJSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "unavailable"},
+        )
+    stats = pool.get_stats()
+    return ORJSONResponse(
+        content={
+            "status": "ok",
+            "pool_size": stats.get("pool_size"),
+            "pool_available": stats.get("pool_available"),
+            "requests_waiting": stats.get("requests_waiting"),
+        }
+    )
+
+
 @app.post("/customers", response_model=Customer, status_code=status.HTTP_201_CREATED)
 async def create_customer(
     payload: CustomerCreate, conn: AsyncConnection = Depends(connection)
@@ -202,6 +243,25 @@ async def create_customer(
     return Customer(**customer_row)
 
 
+# The Customer columns, with NUMERIC cast to float8 in SQL so every value is
+# a type orjson encodes natively and rows can be sent without a model pass
+CUSTOMER_COLUMNS = ", ".join(
+    f"{name}::float8 AS {name}" if field.annotation is float else name
+    for name, field in Customer.model_fields.items()
+)
+
+# One query text for every filter combination, so a single prepared plan
+# serves all list requests; unset filters are passed as NULL
+LIST_CUSTOMERS_SQL = f"""
+    SELECT {CUSTOMER_COLUMNS} FROM customers
+    WHERE (%(risk_level)s::text IS NULL OR risk_level = %(risk_level)s)
+      AND (%(status)s::text IS NULL OR status = %(status)s)
+      AND (%(data_validated)s::text IS NULL OR data_validated = %(data_validated)s)
+    ORDER BY created_at DESC
+    LIMIT %(limit)s
+"""
+
+
 @app.get("/customers", response_model=List[Customer])
 async def list_customers(
     risk_level: Optional[str] = Query(None),
@@ -209,27 +269,18 @@ async def list_customers(
     data_validated: Optional[str] = Query(None),
     limit: int = Query(100, le=500),
     conn: AsyncConnection = Depends(connection),
-) -> List[Customer]:
-    clauses = []
-    params: list = []
-    if risk_level:
-        clauses.append("risk_level = %s")
-        params.append(risk_level)
-    if status:
-        clauses.append("status = %s")
-        params.append(status)
-    if data_validated:
-        clauses.append("data_validated = %s")
-        params.append(data_validated)
-    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
-
-    query = f"SELECT * FROM customers {where} ORDER BY created_at DESC LIMIT %s"
-    params.append(limit)
-
+) -> ORJSONResponse:
+    params = {
+        "risk_level": risk_level or None,
+        "status": status or None,
+        "data_validated": data_validated or None,
+        "limit": limit,
+    }
     async with conn.cursor(row_factory=dict_row) as cur:
-        await cur.execute(query, params)
+        await cur.execute(LIST_CUSTOMERS_SQL, params, prepare=True)
         rows = await cur.fetchall()
-    return [Customer(**row) for row in rows]
+    # Rows already have the Customer shape; orjson encodes them directly
+    return ORJSONResponse(content=rows)
 
 
 @app.get("/customers/{customer_id}", response_model=Customer)
@@ -621,7 +672,7 @@ async def list_transactions(
             data["created_at"] = data["created_at"].isoformat()
         serialized_rows.append(data)
 
-    return JSONResponse(
+    return ORJSONResponse(
         content={
             "transactions": serialized_rows,
             "total": total,
@@ -637,32 +688,40 @@ async def list_transactions(
     )
 
 
+# Columns of AlertDefinition, with NUMERIC cast to its float wire type in SQL.
+# Every value then already has the model's wire type, so rows are sent to
+# orjson as-is without going through the model.
+LIST_ALERT_DEFINITIONS_SQL = """
+    SELECT id, code, name, description, category, enabled, severity,
+           threshold_amount::float8 AS threshold_amount, window_minutes,
+           channels, country_scope, direction, is_system_default,
+           created_at, updated_at
+    FROM alert_definitions
+    ORDER BY id
+"""
+
+
 @app.get("/alert-definitions", response_model=List[AlertDefinition])
-async def list_alert_definitions(conn: AsyncConnection = Depends(connection)) -> List[AlertDefinition]:
+async def list_alert_definitions(conn: AsyncConnection = Depends(connection)) -> ORJSONResponse:
     async with conn.cursor(row_factory=dict_row) as cur:
-        await cur.execute("SELECT * FROM alert_definitions ORDER BY id")
-        rows = await cur.fetchall()
-    return [AlertDefinition(**row) for row in rows]
+        await cur.execute(LIST_ALERT_DEFINITIONS_SQL, prepare=True)
+        return ORJSONResponse(content=await cur.fetchall())
 
 
-@app.post("/alert-definitions", response_model=AlertDefinition, status_code=status.HTTP_201_CREATED)
-async def create_alert_definition(
-    payload: AlertDefinitionCreate, conn: AsyncConnection = Depends(connection)
-) -> AlertDefinition:
-    # Check if code already exists
-    async with conn.cursor(row_factory=dict_row) as cur:
-        await cur.execute("SELECT id FROM alert_definitions WHERE code = %s", (payload.code,))
-        if await cur.fetchone():
-            raise HTTPException(status_code=400, detail="Alert definition with this code already exists")
+# Shared by single and bulk creation. The unique code constraint rejects
+# duplicates atomically; no row back means the code is taken.
+INSERT_ALERT_DEFINITION_SQL = """
+    INSERT INTO alert_definitions
+    (code, name, description, category, enabled, severity, threshold_amount,
+     window_minutes, channels, country_scope, direction, is_system_default)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (code) DO NOTHING
+    RETURNING *
+"""
 
-    query = """
-        INSERT INTO alert_definitions
-        (code, name, description, category, enabled, severity, threshold_amount,
-         window_minutes, channels, country_scope, direction, is_system_default)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        RETURNING *
-    """
-    params = (
+
+def _alert_definition_params(payload: AlertDefinitionCreate) -> tuple:
+    return (
         payload.code,
         payload.name,
         payload.description,
@@ -676,12 +735,57 @@ async def create_alert_definition(
         payload.direction,
         False,  # User-created alerts are never system defaults
     )
+
+
+@app.post("/alert-definitions", response_model=AlertDefinition, status_code=status.HTTP_201_CREATED)
+async def create_alert_definition(
+    payload: AlertDefinitionCreate, conn: AsyncConnection = Depends(connection)
+) -> AlertDefinition:
     async with conn.cursor(row_factory=dict_row) as cur:
-        await cur.execute(query, params)
+        await cur.execute(INSERT_ALERT_DEFINITION_SQL, _alert_definition_params(payload), prepare=True)
         row = await cur.fetchone()
+        if not row:
+            raise HTTPException(status_code=400, detail="Alert definition with this code already exists")
     return AlertDefinition(**row)
 
 
+@app.post(
+    "/alert-definitions/bulk",
+    response_model=List[AlertDefinition],
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_alert_definitions_bulk(
+    payload: List[AlertDefinitionCreate], conn: AsyncConnection = Depends(connection)
+) -> List[AlertDefinition]:
+    """
+    Create several alert definitions in one pipelined batch
+    Codes that already exist are skipped; the created definitions are returned
+    Max 500 definitions per batch.
+    """
+    if len(payload) > 500:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Maximum 500 alert definitions per batch"
+        )
+    if not payload:
+        return []
+    created = []
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await cur.executemany(
+            INSERT_ALERT_DEFINITION_SQL,
+            [_alert_definition_params(item) for item in payload],
+            returning=True,
+        )
+        # One result set per input row; skipped duplicates return no row
+        while True:
+            row = await cur.fetchone()
+            if row:
+                created.append(row)
+            if not cur.nextset():
+                break
+    return ALERT_DEFINITION_LIST_ADAPTER.validate_python(created)
+
+
 @app.patch("/alert-definitions/{definition_id}", response_model=AlertDefinition)
 async def update_alert_definition(
     definition_id: int, payload: AlertDefinitionUpdate, conn: AsyncConnection = Depends(connection)
@@ -715,10 +819,20 @@ async def update_alert_definition(
 async def delete_alert_definition(
     definition_id: int, conn: AsyncConnection = Depends(connection)
 ) -> None:
-    # Check if alert definition exists and is not a system default
+    # One round trip: the DELETE skips system defaults, and the outer SELECT
+    # reports the row as it was before the statement, which tells a missing
+    # definition (no row) from a protected one
     async with conn.cursor(row_factory=dict_row) as cur:
         await cur.execute(
-            "SELECT is_system_default FROM alert_definitions WHERE id = %s", (definition_id,)
+            """
+            WITH deleted AS (
+                DELETE FROM alert_definitions
+                WHERE id = %(id)s AND NOT is_system_default
+                RETURNING id
+            )
+            SELECT is_system_default FROM alert_definitions WHERE id = %(id)s
+            """,
+            {"id": definition_id},
         )
         row = await cur.fetchone()
         if not row:
@@ -726,9 +840,6 @@ async def delete_alert_definition(
         if row["is_system_default"]:
             raise HTTPException(status_code=403, detail="Cannot delete system default alert definitions")
 
-    async with conn.cursor() as cur:
-        await cur.execute("DELETE FROM alert_definitions WHERE id = %s", (definition_id,))
-
 
 # NOTE: Alert CRUD and lifecycle endpoints moved to alerts.py router
 
@@ -846,8 +957,6 @@ async def start_kyc_workflow(customer_id: UUID, days_before: int = 365) -> dict:
         raise HTTPException(status_code=503, detail="Temporal client not connected")
 
     try:
-        from src.workflows.worker import KycRefreshWorkflow
-
         handle = await temporal_client.start_workflow(
             KycRefreshWorkflow.run,
             args=[str(customer_id), days_before],
@@ -873,8 +982,6 @@ async def start_sanctions_workflow(customer_id: UUID, hit_detected: bool = False
         raise HTTPException(status_code=503, detail="Temporal client not connected")
 
     try:
-        from src.workflows.worker import SanctionsScreeningWorkflow
-
         handle = await temporal_client.start_workflow(
             SanctionsScreeningWorkflow.run,
             args=[str(customer_id), hit_detected],
@@ -893,6 +1000,60 @@ async def start_sanctions_workflow(customer_id: UUID, hit_detected: bool = False
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Marks the alert as investigating and returns its open investigation task,
+# creating one when there is none, in a single round trip. No row back means
+# the alert does not exist.
+START_ALERT_INVESTIGATION_SQL = """
+    WITH alert AS (
+        UPDATE alerts
+        SET status = 'investigating'
+        WHERE id = %(alert_id)s
+        RETURNING id, customer_id, scenario, severity
+    ),
+    existing AS (
+        SELECT t.id, t.customer_id, t.details
+        FROM tasks t
+        WHERE t.alert_id = %(alert_id)s
+          AND t.task_type = 'investigation'
+          AND t.status IN ('pending', 'in_progress')
+        LIMIT 1
+    ),
+    created AS (
+        INSERT INTO tasks (
+            customer_id, alert_id, task_type, priority,
+            title, description, details, created_by
+        )
+        SELECT
+            a.customer_id,
+            a.id,
+            'investigation',
+            CASE lower(a.severity)
+                WHEN 'critical' THEN 'critical'
+                WHEN 'high' THEN 'high'
+                WHEN 'low' THEN 'low'
+                ELSE 'medium'
+            END,
+            'Investigate alert ' || a.id,
+            COALESCE(NULLIF(a.scenario, ''), 'Investigate triggered alert'),
+            jsonb_build_object(
+                'alert_id', a.id,
+                'action', %(action)s::text,
+                'scenario', a.scenario,
+                'severity', a.severity,
+                'source', 'alert-handling'
+            ),
+            %(created_by)s
+        FROM alert a
+        WHERE NOT EXISTS (SELECT 1 FROM existing)
+        RETURNING id, customer_id, details
+    )
+    SELECT id, customer_id, details FROM created
+    UNION ALL
+    SELECT id, customer_id, details FROM existing
+    WHERE EXISTS (SELECT 1 FROM alert)
+"""
+
+
 @app.post("/workflows/alert-handling/start")
 async def start_alert_workflow(
     alert_id: int,
@@ -905,75 +1066,14 @@ async def start_alert_workflow(
         raise HTTPException(status_code=503, detail="Temporal client not connected")
 
     try:
-        from src.workflows.worker import AlertHandlingWorkflow, InvestigationWorkflow
-
         async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute("SELECT * FROM alerts WHERE id = %s", (alert_id,))
-            alert = await cur.fetchone()
-            if not alert:
-                raise HTTPException(status_code=404, detail="Alert not found")
-
-            # Mark alert as investigating
-            await cur.execute(
-                """
-                UPDATE alerts
-                SET status = 'investigating'
-                WHERE id = %s
-                """,
-                (alert_id,),
-            )
-
-            # Reuse existing investigation task for this alert if it exists
             await cur.execute(
-                """
-                SELECT * FROM tasks
-                WHERE alert_id = %s
-                  AND task_type = 'investigation'
-                  AND status IN ('pending', 'in_progress')
-                LIMIT 1
-                """,
-                (alert_id,),
+                START_ALERT_INVESTIGATION_SQL,
+                {"alert_id": alert_id, "action": action, "created_by": resolved_by or "system"},
             )
             task = await cur.fetchone()
-
             if not task:
-                priority = {
-                    "critical": "critical",
-                    "high": "high",
-                    "medium": "medium",
-                    "low": "low",
-                }.get((alert.get("severity") or "").lower(), "medium")
-
-                title = f"Investigate alert {alert_id}"
-                description = alert.get("scenario") or "Investigate triggered alert"
-                details = Jsonb({
-                    "alert_id": alert_id,
-                    "action": action,
-                    "scenario": alert.get("scenario"),
-                    "severity": alert.get("severity"),
-                    "source": "alert-handling",
-                })
-
-                await cur.execute(
-                    """
-                    INSERT INTO tasks (
-                        customer_id, alert_id, task_type, priority,
-                        title, description, details, created_by
-                    )
-                    VALUES (%s, %s, 'investigation', %s, %s, %s, %s, %s)
-                    RETURNING *
-                    """,
-                    (
-                        alert.get("customer_id"),
-                        alert_id,
-                        priority,
-                        title,
-                        description,
-                        details,
-                        resolved_by or "system",
-                    ),
-                )
-                task = await cur.fetchone()
+                raise HTTPException(status_code=404, detail="Alert not found")
 
             workflow_id = f"alert-{alert_id}-investigation-{datetime.utcnow().timestamp()}"
 
@@ -247,6 +247,11 @@ TASK_TYPES = ["investigation", "kyc_refresh", "document_request", "escalation",
 TASK_STATUSES = ["pending", "in_progress", "completed"]
 TASK_PRIORITIES = ["low", "medium", "high", "critical"]
 
+# Set views for membership checks on the request path
+TASK_TYPES_SET = frozenset(TASK_TYPES)
+TASK_STATUSES_SET = frozenset(TASK_STATUSES)
+TASK_PRIORITIES_SET = frozenset(TASK_PRIORITIES)
+
 
 class Task(BaseModel):
     id: int
@@ -372,6 +377,7 @@ class TaskDefinitionUpdate(BaseModel):
 # =============================================================================
 
 USER_ROLES = ["analyst", "senior_analyst", "manager", "admin"]
+USER_ROLES_SET = frozenset(USER_ROLES)
 
 
 class User(BaseModel):
@@ -440,6 +446,25 @@ class TaskAttachment(BaseModel):
     user_name: Optional[str] = None
 
 
+class TaskAttachmentPresignRequest(BaseModel):
+    filename: str
+    content_type: str = "application/octet-stream"
+
+
+class TaskAttachmentPresign(BaseModel):
+    # POST the file to url as multipart/form-data with fields plus "file"
+    url: str
+    fields: dict[str, str]
+    key: str
+    expires_in: int
+
+
+class TaskAttachmentConfirm(BaseModel):
+    # The original filename is read from the object metadata the presign pinned
+    user_id: UUID
+    key: str
+
+
 # =============================================================================
 # TASK STATUS HISTORY MODELS
 # =============================================================================
@@ -464,6 +489,10 @@ ALERT_STATUSES = ['open', 'assigned', 'in_progress', 'escalated', 'on_hold', 're
 RESOLUTION_TYPES = ['confirmed_suspicious', 'false_positive', 'not_suspicious', 'duplicate', 'other']
 ALERT_PRIORITIES = ['low', 'medium', 'high', 'critical']
 
+# Set views for membership checks on the request path
+ALERT_STATUSES_SET = frozenset(ALERT_STATUSES)
+RESOLUTION_TYPES_SET = frozenset(RESOLUTION_TYPES)
+
 
 class AlertFull(BaseModel):
     """Full alert model with lifecycle fields"""
@@ -3,10 +3,11 @@ S3-compatible storage client for file attachments.
 Uses MinIO in development, can be configured for AWS S3 in production.
 """
 import os
-from typing import Optional
+from typing import BinaryIO, Optional
 from io import BytesIO
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 from botocore.exceptions import ClientError
 
@@ -18,6 +19,13 @@ S3_SECRET_KEY = os.getenv("S3_SECRET_KEY", "minioadmin")
 S3_BUCKET = os.getenv("S3_BUCKET", "aml-attachments")
 S3_REGION = os.getenv("S3_REGION", "us-east-1")
 
+# Uploads above the threshold go as multipart, with parts sent in parallel
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=8,
+)
+
 # Singleton client
 _s3_client = None
 
@@ -84,6 +92,41 @@ def upload_file(
     return key
 
 
+def upload_fileobj(
+    fileobj: BinaryIO,
+    key: str,
+    content_type: str = "application/octet-stream",
+    metadata: Optional[dict] = None,
+) -> str:
+    """
+    Upload a file-like object to S3, reading it in chunks.
+
+    Args:
+        fileobj: Readable binary file positioned at the start of the content
+        key: S3 object key (path within bucket)
+        content_type: MIME type of the file
+        metadata: Optional metadata dict
+
+    Returns:
+        The S3 key where the file was stored
+    """
+    client = get_s3_client()
+
+    extra_args = {"ContentType": content_type}
+    if metadata:
+        extra_args["Metadata"] = metadata
+
+    client.upload_fileobj(
+        fileobj,
+        S3_BUCKET,
+        key,
+        ExtraArgs=extra_args,
+        Config=TRANSFER_CONFIG,
+    )
+
+    return key
+
+
 def download_file(key: str) -> tuple[bytes, str, Optional[str]]:
     """
     Download a file from S3.
@@ -105,6 +148,27 @@ def download_file(key: str) -> tuple[bytes, str, Optional[str]]:
     return content, content_type, original_filename
 
 
+def open_file(key: str, byte_range: Optional[str] = None) -> dict:
+    """
+    Open a file in S3 for streaming, without reading its content.
+
+    Args:
+        key: S3 object key
+        byte_range: Optional HTTP Range value (e.g. "bytes=0-1023") to fetch
+            only part of the object
+
+    Returns:
+        The get_object response; its "Body" is a StreamingBody to iterate
+        with iter_chunks() and close when done. For a range request
+        "ContentRange" holds the Content-Range of the returned part.
+    """
+    client = get_s3_client()
+
+    if byte_range:
+        return client.get_object(Bucket=S3_BUCKET, Key=key, Range=byte_range)
+    return client.get_object(Bucket=S3_BUCKET, Key=key)
+
+
 def delete_file(key: str) -> bool:
     """
     Delete a file from S3.
@@ -143,6 +207,61 @@ def file_exists(key: str) -> bool:
         return False
 
 
+def get_file_info(key: str) -> Optional[dict]:
+    """
+    Get a file's size and content type from S3 without downloading it.
+
+    Args:
+        key: S3 object key
+
+    Returns:
+        The head_object response, or None if the file does not exist
+    """
+    client = get_s3_client()
+
+    try:
+        return client.head_object(Bucket=S3_BUCKET, Key=key)
+    except ClientError:
+        return None
+
+
+def generate_presigned_post(
+    key: str,
+    content_type: str,
+    max_size: int,
+    metadata: Optional[dict] = None,
+    expires_in: int = 900,
+) -> dict:
+    """
+    Generate a presigned POST for uploading a file directly to S3.
+
+    Args:
+        key: S3 object key the upload must be stored under
+        content_type: MIME type the upload must declare
+        max_size: Maximum accepted file size in bytes
+        metadata: Optional metadata dict stored with the object
+        expires_in: Expiration time in seconds (default 15 minutes)
+
+    Returns:
+        Dict with the "url" to POST to and the form "fields" to send
+    """
+    client = get_s3_client()
+
+    fields = {"Content-Type": content_type}
+    for name, value in (metadata or {}).items():
+        fields[f"x-amz-meta-{name}"] = value
+    conditions = [{name: value} for name, value in fields.items()]
+    conditions.append(["content-length-range", 0, max_size])
+
+    return client.generate_presigned_post(
+        S3_BUCKET,
+        key,
+        Fields=fields,
+        Conditions=conditions,
+        ExpiresIn=expires_in,
+    )
+
+
 def generate_presigned_url(key: str, expires_in: int = 3600) -> str:
     """
     Generate a presigned URL for temporary direct access to a file.
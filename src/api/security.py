@@ -2,66 +2,73 @@
 Security utilities for JWT authentication and password hashing
 """
 import hashlib
-from datetime import datetime, timedelta, timezone
+import time
+from datetime import datetime, timezone
 from typing import Optional
 from uuid import UUID
 
+import bcrypt
+import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from jwt import PyJWTError as JWTError
 from psycopg import AsyncConnection
 from psycopg.rows import dict_row
 
 from .config import settings
 from .db import connection
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # HTTP Bearer token extractor
 security = HTTPBearer(auto_error=False)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
 
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=settings.bcrypt_cost)).decode()
 
 
 def create_access_token(user_id: str, role: str, email: str) -> str:
     """Create a JWT access token"""
-    expire = datetime.now(timezone.utc) + timedelta(minutes=settings.access_token_expire_minutes)
+    now = int(time.time())
     payload = {
         "sub": user_id,
         "role": role,
         "email": email,
         "type": "access",
-        "exp": expire,
-        "iat": datetime.now(timezone.utc),
+        "exp": now + settings.access_token_expire_minutes * 60,
+        "iat": now,
     }
     return jwt.encode(payload, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
 
 
 def create_refresh_token(user_id: str, token_id: str) -> str:
     """Create a JWT refresh token"""
-    expire = datetime.now(timezone.utc) + timedelta(days=settings.refresh_token_expire_days)
+    now = int(time.time())
     payload = {
         "sub": user_id,
         "jti": token_id,
         "type": "refresh",
-        "exp": expire,
-        "iat": datetime.now(timezone.utc),
+        "exp": now + settings.refresh_token_expire_days * 86400,
+        "iat": now,
     }
     return jwt.encode(payload, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
 
 
 def decode_token(token: str) -> dict:
     """Decode and validate a JWT token"""
+    # Reject anything that is not header.payload.signature before doing any
+    # base64, JSON or HMAC work
+    if token.count(".") != 2:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token: malformed",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     try:
         payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
         return payload
@@ -73,6 +80,29 @@ def decode_token(token: str) -> dict:
         )
 
 
+# Access tokens whose signature has already been verified, keyed by the raw
+# token. Clients resend the same token until it expires, so the HMAC check
+# runs once per token per process instead of on every request.
+VERIFIED_TOKEN_CACHE_SIZE = 10_000
+_verified_tokens: dict[str, dict] = {}
+
+
+def decode_access_token(token: str) -> dict:
+    """Decode a bearer token, reusing the result of an earlier verification"""
+    payload = _verified_tokens.get(token)
+    if payload is not None:
+        if payload.get("exp", 0) > time.time():
+            return payload
+        del _verified_tokens[token]
+
+    payload = decode_token(token)
+    if len(_verified_tokens) >= VERIFIED_TOKEN_CACHE_SIZE:
+        # Evict the oldest entry (dicts keep insertion order)
+        del _verified_tokens[next(iter(_verified_tokens))]
+    _verified_tokens[token] = payload
+    return payload
+
+
 def hash_refresh_token(token: str) -> str:
     """Hash a refresh token for database storage"""
     return hashlib.sha256(token.encode()).hexdigest()
@@ -94,7 +124,7 @@ async def get_current_user(
         )
 
     token = credentials.credentials
-    payload = decode_token(token)
+    payload = decode_access_token(token)
 
     # Verify token type
     if payload.get("type") != "access":
@@ -112,7 +142,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Fetch user from database
+    # Fetch user from database (prepared: runs on every authenticated request)
     async with conn.cursor(row_factory=dict_row) as cur:
         await cur.execute(
             """
@@ -121,6 +151,7 @@ async def get_current_user(
             WHERE id = %s
             """,
             (user_id,),
+            prepare=True,
         )
         user = await cur.fetchone()
 
@@ -168,17 +199,28 @@ def require_role(*allowed_roles: str):
     Dependency factory to require specific roles.
     Usage: user: dict = Depends(require_role("admin", "manager"))
     """
+    # Resolved once per factory call rather than on every request
+    allowed = frozenset(allowed_roles)
+    denied_template = f"Role '%s' not authorized. Required: {', '.join(allowed_roles)}"
+
     async def role_checker(user: dict = Depends(get_current_user)) -> dict:
-        if user["role"] not in allowed_roles:
+        if user["role"] not in allowed:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Role '{user['role']}' not authorized. Required: {', '.join(allowed_roles)}",
+                detail=denied_template % user["role"],
             )
         return user
 
     return role_checker
 
 
+# Shared checkers so every endpoint depends on the same callable, which lets
+# FastAPI reuse the resolved dependency within a request
+_admin_checker = require_role("admin")
+_manager_or_above_checker = require_role("manager", "admin")
+_senior_or_above_checker = require_role("senior_analyst", "manager", "admin")
+
+
 def require_any_role():
     """Dependency that requires any authenticated user"""
     return get_current_user
@@ -186,14 +228,14 @@ def require_any_role():
 
 def require_admin():
     """Dependency that requires admin role"""
-    return require_role("admin")
+    return _admin_checker
 
 
 def require_manager_or_above():
     """Dependency that requires manager or admin role"""
-    return require_role("manager", "admin")
+    return _manager_or_above_checker
 
 
 def require_senior_or_above():
     """Dependency that requires senior_analyst, manager, or admin role"""
-    return require_role("senior_analyst", "manager", "admin")
+    return _senior_or_above_checker
@@ -2,141 +2,389 @@
 Server-Sent Events (SSE) streaming endpoints for real-time updates
 """
 import asyncio
-import json
-from datetime import datetime
-from typing import AsyncGenerator
-
-from fastapi import APIRouter, Depends
+import logging
+import time
+import zlib
+from decimal import Decimal
+from typing import Any, AsyncGenerator, Callable, Optional
+
+import orjson
+from fastapi import APIRouter, Request
 from fastapi.responses import StreamingResponse
 from psycopg import AsyncConnection
 from psycopg.rows import dict_row
 
-from .db import connection
+from .db import get_dsn
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
+# Seconds without an event before a keepalive comment is sent, so proxies
+# do not close idle streams
+KEEPALIVE_INTERVAL = 15
 
-async def generate_transaction_stream(conn: AsyncConnection) -> AsyncGenerator[str, None]:
-    """
-    Generate SSE stream for new transactions
-    Polls database every 500ms for new transactions
-    Only streams transactions created AFTER the connection is established
-    """
-    # Start from current max id - only stream NEW transactions
-    async with conn.cursor() as cur:
-        await cur.execute("SELECT COALESCE(MAX(id), 0) FROM transactions")
-        result = await cur.fetchone()
-        last_id = result[0] if result else 0
+# Seconds to keep absorbing notifications after the first one, so a burst of
+# commits results in one fetch instead of one per commit
+COALESCE_WINDOW = 0.05
 
-    try:
-        while True:
-            async with conn.cursor(row_factory=dict_row) as cur:
-                await cur.execute(
-                    """
-                    SELECT
-                        t.id,
-                        t.surrogate_id,
-                        t.person_first_name,
-                        t.person_last_name,
-                        t.vendor_name,
-                        t.amount,
-                        t.original_transaction_amount,
-                        t.transaction_financial_status,
-                        t.client_settlement_status,
-                        t.vendor_settlement_status,
-                        t.transaction_delivery_status,
-                        t.created_at,
-                        t.customer_id,
-                        c.full_name as customer_name,
-                        c.risk_level
-                    FROM transactions t
-                    LEFT JOIN customers c ON c.id = t.customer_id
-                    WHERE t.id > %s
-                    ORDER BY t.id ASC
-                    LIMIT 50
-                    """,
-                    (last_id,),
-                )
+# Reconnect delay sent to EventSource clients, so a restart or a dropped
+# proxy does not make every dashboard reconnect at once
+RECONNECT_DELAY_MS = 30000
 
-                rows = await cur.fetchall()
+# Chunks buffered per client; a client that falls this far behind loses its
+# oldest chunks (and is told so) rather than growing memory without bound
+SUBSCRIBER_QUEUE_SIZE = 256
 
-                if rows:
-                    for row in rows:
-                        # Convert to dict and handle types
-                        data = dict(row)
-                        if data.get("customer_id"):
-                            data["customer_id"] = str(data["customer_id"])
-                        data["amount"] = float(data["amount"])
-                        data["original_transaction_amount"] = float(data["original_transaction_amount"])
-                        data["created_at"] = data["created_at"].isoformat()
+# Seconds before the first re-fetch while committed rows are still held back
+# behind an older running transaction (see StreamHub.pending_query). The
+# delay doubles on every retry that makes no progress, up to
+# PENDING_RETRY_MAX_DELAY, so a stuck transaction elsewhere in the cluster
+# does not turn the hub into a 5 Hz polling loop.
+PENDING_RETRY_DELAY = 0.2
+PENDING_RETRY_MAX_DELAY = 5.0
 
-                        # SSE format: "data: {json}\n\n"
-                        yield f"data: {json.dumps(data)}\n\n"
-                        last_id = data["id"]
+# Seconds a stream may be held back before the hub logs a warning
+PENDING_WARN_AFTER = 30.0
 
-            # Check for new transactions every 500ms
-            await asyncio.sleep(0.5)
 
-    except asyncio.CancelledError:
-        # Client disconnected
-        pass
+async def _wait_for_notify(conn: AsyncConnection) -> bool:
+    """
+    Wait for the next notification on a listening connection
+    Returns False if none arrived within KEEPALIVE_INTERVAL
+    """
+    received = False
+    # Let the generator run to completion so it releases the connection lock
+    async for _ in conn.notifies(timeout=KEEPALIVE_INTERVAL, stop_after=1):
+        received = True
+    return received
 
 
-async def generate_alert_stream(conn: AsyncConnection) -> AsyncGenerator[str, None]:
+class StreamHub:
     """
-    Generate SSE stream for new alerts
-    Polls database every 500ms for new alerts
-    Only streams alerts created AFTER the connection is established
+    Fans out one database listener to every SSE client of a stream
+
+    A single background task LISTENs on the channel, runs the fetch query
+    once per notification and renders each batch of rows to SSE frames once;
+    the chunk is then pushed to every subscriber queue. Database load is
+    independent of the number of connected clients.
     """
-    # Start from current max id - only stream NEW alerts
-    async with conn.cursor() as cur:
-        await cur.execute("SELECT COALESCE(MAX(id), 0) FROM alerts")
-        result = await cur.fetchone()
-        last_id = result[0] if result else 0
 
-    try:
+    def __init__(
+        self,
+        channel: str,
+        seed_query: str,
+        fetch_query: str,
+        batch_size: int,
+        render: Callable[[dict], bytes],
+        cursor_columns: tuple[str, ...] = ("id",),
+        pending_query: Optional[str] = None,
+    ) -> None:
+        self.channel = channel
+        self.seed_query = seed_query
+        self.fetch_query = fetch_query
+        self.batch_size = batch_size
+        self.render = render
+        self.cursor_columns = cursor_columns
+        # Optional EXISTS query: true while rows past the cursor are committed
+        # but not yet returned by fetch_query
+        self.pending_query = pending_query
+        # Subscriber queue -> events dropped since its last delivered chunk
+        self.subscribers: dict[asyncio.Queue[bytes], int] = {}
+        self._cursor: Optional[tuple[Any, ...]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self) -> asyncio.Queue[bytes]:
+        queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.subscribers[queue] = 0
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue[bytes]) -> None:
+        self.subscribers.pop(queue, None)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _publish(self, queue: asyncio.Queue[bytes], chunk: bytes) -> None:
+        if queue.full():
+            # Slow client: drop its oldest chunk so it never stalls the others.
+            # Every frame ends in a blank line and orjson never emits raw
+            # newlines, so counting them gives the number of events lost.
+            dropped = queue.get_nowait()
+            if queue in self.subscribers:
+                self.subscribers[queue] += dropped.count(b"\n\n")
+        queue.put_nowait(chunk)
+
+    def take_missed(self, queue: asyncio.Queue[bytes]) -> int:
+        missed = self.subscribers.get(queue, 0)
+        if missed:
+            self.subscribers[queue] = 0
+        return missed
+
+    async def _run(self) -> None:
+        # Reconnect on database errors; the cursor survives so nothing is skipped
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Stream hub '{self.channel}' lost its connection: {e}")
+                await asyncio.sleep(1)
+
+    async def _listen(self) -> None:
+        # LISTEN needs a session outside of a transaction, so the hub owns a
+        # dedicated autocommit connection instead of borrowing one from the pool
+        async with await AsyncConnection.connect(get_dsn(), autocommit=True) as conn:
+            await conn.execute(f"LISTEN {self.channel}")
+
+            # Start from the current position - only stream NEW rows
+            if self._cursor is None:
+                async with conn.cursor() as cur:
+                    await cur.execute(self.seed_query)
+                    self._cursor = tuple(await cur.fetchone())
+
+            while True:
+                if not await _wait_for_notify(conn):
+                    continue
+
+                # Swallow the rest of a burst; the fetch below covers it all
+                async for _ in conn.notifies(timeout=COALESCE_WINDOW):
+                    pass
+
+                await self._drain(conn)
+                await self._drain_pending(conn)
+
+    async def _drain(self, conn: AsyncConnection) -> None:
+        # Fetch everything written since the last event
         while True:
             async with conn.cursor(row_factory=dict_row) as cur:
-                await cur.execute(
-                    """
-                    SELECT
-                        id,
-                        customer_id,
-                        type,
-                        status,
-                        severity,
-                        scenario,
-                        details,
-                        alert_definition_id,
-                        created_at
-                    FROM alerts
-                    WHERE id > %s
-                    ORDER BY id ASC
-                    LIMIT 20
-                    """,
-                    (last_id,),
+                await cur.execute(self.fetch_query, self._cursor, prepare=True)
+                rows = await cur.fetchall()
+
+            if rows:
+                # One chunk per batch: a single queue put and a single
+                # ASGI send per client instead of one per row
+                chunk = b"".join(map(self.render, rows))
+                for queue in list(self.subscribers):
+                    self._publish(queue, chunk)
+                self._cursor = tuple(rows[-1][c] for c in self.cursor_columns)
+
+            if len(rows) < self.batch_size:
+                return
+
+    async def _drain_pending(self, conn: AsyncConnection) -> None:
+        # The commit that notified us may not be readable yet; retry without
+        # waiting for another notification, which may never come
+        delay = PENDING_RETRY_DELAY
+        held_since = time.monotonic()
+        warned = False
+        while await self._has_pending(conn):
+            held = time.monotonic() - held_since
+            if not warned and held > PENDING_WARN_AFTER:
+                logger.warning(
+                    f"Stream hub '{self.channel}' held back for {held:.0f}s "
+                    "by a long-running transaction in the database cluster"
                 )
+                warned = True
+            await asyncio.sleep(delay)
+            cursor = self._cursor
+            await self._drain(conn)
+            if self._cursor != cursor:
+                # Progress: the blocking transaction moved on, poll quickly again
+                delay = PENDING_RETRY_DELAY
+                held_since = time.monotonic()
+            else:
+                delay = min(delay * 2, PENDING_RETRY_MAX_DELAY)
+        if warned:
+            logger.info(f"Stream hub '{self.channel}' caught up")
+
+    async def _has_pending(self, conn: AsyncConnection) -> bool:
+        if self.pending_query is None:
+            return False
+        async with conn.cursor() as cur:
+            await cur.execute(self.pending_query, self._cursor, prepare=True)
+            row = await cur.fetchone()
+        return bool(row and row[0])
+
+
+async def _subscribe(hub: StreamHub) -> AsyncGenerator[bytes, None]:
+    """Relay a hub's frames to one client, with keepalives when idle"""
+    queue = hub.subscribe()
+    try:
+        yield b"retry: %d\n\n" % RECONNECT_DELAY_MS
+        while True:
+            try:
+                chunk = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+
+            missed = hub.take_missed(queue)
+            if missed:
+                # Named event: onmessage handlers ignore it, clients that care
+                # can listen for "gap" and reload
+                yield b"event: gap\ndata: " + orjson.dumps({"missed": missed}) + b"\n\n"
+            yield chunk
+    except asyncio.CancelledError:
+        # Client disconnected
+        pass
+    finally:
+        hub.unsubscribe(queue)
+
+
+def _json_default(obj):
+    # orjson handles datetime and UUID natively; NUMERIC columns arrive as Decimal
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError
+
+
+def _render_row(row: dict) -> bytes:
+    # SSE format: "data: {json}\n\n"
+    return b"data: " + orjson.dumps(row, default=_json_default) + b"\n\n"
+
+
+# Stream queries cast NUMERIC and UUID columns to their JSON wire types in
+# SQL, so hub rows go straight to orjson without touching _json_default.
+# Both tables are hypertables keyed on created_at, which every insert path
+# leaves at its NOW() default. The created_at lower bound lets TimescaleDB
+# exclude all but the newest chunks, so the id keyset probe only touches the
+# (id, created_at) primary key index of recent chunks instead of every chunk.
+# The hour of slack covers rows committed by long-running transactions.
+TXN_STREAM_SQL = """
+    SELECT
+        t.id,
+        t.surrogate_id,
+        t.person_first_name,
+        t.person_last_name,
+        t.vendor_name,
+        t.amount::float8 AS amount,
+        t.original_transaction_amount::float8 AS original_transaction_amount,
+        t.transaction_financial_status,
+        t.client_settlement_status,
+        t.vendor_settlement_status,
+        t.transaction_delivery_status,
+        t.created_at,
+        t.customer_id::text AS customer_id,
+        c.full_name as customer_name,
+        c.risk_level
+    FROM transactions t
+    LEFT JOIN customers c ON c.id = t.customer_id
+    WHERE t.id > %s
+      AND t.created_at > now() - interval '1 hour'
+    ORDER BY t.id ASC
+    LIMIT 50
+"""
 
-                rows = await cur.fetchall()
+ALERT_STREAM_SQL = """
+    SELECT
+        id,
+        customer_id::text AS customer_id,
+        type,
+        status,
+        severity,
+        scenario,
+        details,
+        alert_definition_id,
+        created_at
+    FROM alerts
+    WHERE id > %s
+      AND created_at > now() - interval '1 hour'
+    ORDER BY id ASC
+    LIMIT 20
+"""
 
-                if rows:
-                    for row in rows:
-                        data = dict(row)
-                        if data["customer_id"]:
-                            data["customer_id"] = str(data["customer_id"])
-                        data["created_at"] = data["created_at"].isoformat()
+transaction_hub = StreamHub(
+    channel="new_transaction",
+    seed_query="SELECT COALESCE(MAX(id), 0) FROM transactions",
+    fetch_query=TXN_STREAM_SQL,
+    batch_size=50,
+    render=_render_row,
+)
 
-                        yield f"data: {json.dumps(data)}\n\n"
-                        last_id = data["id"]
+alert_hub = StreamHub(
+    channel="new_alert",
+    seed_query="SELECT COALESCE(MAX(id), 0) FROM alerts",
+    fetch_query=ALERT_STREAM_SQL,
+    batch_size=20,
+    render=_render_row,
+)
 
-            await asyncio.sleep(0.5)
 
-    except asyncio.CancelledError:
-        pass
+def generate_transaction_stream() -> AsyncGenerator[bytes, None]:
+    """
+    Generate SSE stream for new transactions
+    Only streams transactions created AFTER the connection is established
+    """
+    return _subscribe(transaction_hub)
+
+
+def generate_alert_stream() -> AsyncGenerator[bytes, None]:
+    """
+    Generate SSE stream for new alerts
+    Only streams alerts created AFTER the connection is established
+    """
+    return _subscribe(alert_hub)
+
+
+async def _gzip_stream(stream: AsyncGenerator[bytes, None]) -> AsyncGenerator[bytes, None]:
+    """
+    Gzip an SSE stream chunk by chunk
+    Each chunk is sync-flushed so the client can decode it immediately
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    async for chunk in stream:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip (RFC 9110 12.5.3)"""
+    gzip_q = wildcard_q = None
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding in ("gzip", "x-gzip"):
+            gzip_q = q
+        elif coding == "*":
+            wildcard_q = q
+    # An explicit gzip entry wins over "*"; "gzip;q=0" refuses it
+    if gzip_q is not None:
+        return gzip_q > 0
+    return wildcard_q is not None and wildcard_q > 0
+
+
+def _sse_response(request: Request, stream: AsyncGenerator[bytes, None]) -> StreamingResponse:
+    headers = {
+        "Cache-Control": "no-cache, no-store, must-revalidate",
+        "Connection": "keep-alive",
+        "X-Accel-Buffering": "no",  # Disable nginx buffering if behind proxy
+        "Vary": "Accept-Encoding",
+    }
+    # Event payloads repeat the same JSON keys, so they compress very well
+    if _accepts_gzip(request.headers.get("accept-encoding", "")):
+        headers["Content-Encoding"] = "gzip"
+        stream = _gzip_stream(stream)
+    return StreamingResponse(stream, media_type="text/event-stream", headers=headers)
 
 
 @router.get("/stream/transactions")
-async def stream_transactions(conn: AsyncConnection = Depends(connection)):
+async def stream_transactions(request: Request):
     """
     Server-Sent Events endpoint for real-time transaction updates
 
@@ -147,19 +395,11 @@ async def stream_transactions(conn: AsyncConnection = Depends(connection)):
             console.log(transaction);
         };
     """
-    return StreamingResponse(
-        generate_transaction_stream(conn),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache, no-store, must-revalidate",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",  # Disable nginx buffering if behind proxy
-        },
-    )
+    return _sse_response(request, generate_transaction_stream())
 
 
 @router.get("/stream/alerts")
-async def stream_alerts(conn: AsyncConnection = Depends(connection)):
+async def stream_alerts(request: Request):
     """
     Server-Sent Events endpoint for real-time alert updates
 
@@ -170,77 +410,66 @@ async def stream_alerts(conn: AsyncConnection = Depends(connection)):
             console.log(alert);
         };
     """
-    return StreamingResponse(
-        generate_alert_stream(conn),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache, no-store, must-revalidate",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
-    )
+    return _sse_response(request, generate_alert_stream())
+
+
+def _render_payload(row: dict) -> bytes:
+    # The query already produced the JSON document as text
+    return b"data: " + row["payload"].encode() + b"\n\n"
+
+
+# The task JSON (same shape as the REST endpoints) is built by Postgres, so
+# rendering a frame is only a bytes concatenation.
+# update_seq is taken at write time, not commit time, so it alone can skip a
+# slow transaction's rows. Only rows written by transactions older than every
+# running one (the snapshot xmin) are read: those are all committed, and any
+# later commit has a higher update_xid than the cursor.
+TASK_STREAM_SQL = """
+    SELECT
+        e.update_xid,
+        e.update_seq,
+        (
+            (to_jsonb(e) - 'priority_rank' - 'update_seq' - 'update_xid')
+                || jsonb_build_object('details', COALESCE(e.details, '{}'::jsonb))
+        )::text AS payload
+    FROM tasks_enriched e
+    WHERE (e.update_xid, e.update_seq) > (%s, %s)
+      AND e.update_xid < txid_snapshot_xmin(txid_current_snapshot())
+    ORDER BY e.update_xid ASC, e.update_seq ASC
+    LIMIT 20
+"""
 
+# Committed task writes that TASK_STREAM_SQL still holds back
+TASK_STREAM_PENDING_SQL = """
+    SELECT EXISTS (
+        SELECT 1 FROM tasks WHERE (update_xid, update_seq) > (%s, %s)
+    )
+"""
 
-async def generate_task_stream(conn: AsyncConnection) -> AsyncGenerator[str, None]:
+# Tasks are updated in place, so the task stream follows the writing
+# transaction (update_xid, update_seq) rather than id. Starting at the current
+# xmin streams every write that has not committed yet.
+task_hub = StreamHub(
+    channel="task_updated",
+    seed_query="SELECT txid_snapshot_xmin(txid_current_snapshot()), 0",
+    fetch_query=TASK_STREAM_SQL,
+    batch_size=20,
+    render=_render_payload,
+    cursor_columns=("update_xid", "update_seq"),
+    pending_query=TASK_STREAM_PENDING_SQL,
+)
+
+
+def generate_task_stream() -> AsyncGenerator[bytes, None]:
     """
     Generate SSE stream for task updates
-    Polls database every 1 second for updated tasks
+    Streams tasks created or updated AFTER the connection is established
     """
-    last_updated = datetime.utcnow()
-
-    try:
-        while True:
-            async with conn.cursor(row_factory=dict_row) as cur:
-                await cur.execute(
-                    """
-                    SELECT t.*,
-                           COALESCE(c.first_name || ' ' || c.last_name, c.full_name) as customer_name,
-                           c.risk_level as customer_risk_level,
-                           a.scenario as alert_scenario,
-                           a.severity as alert_severity
-                    FROM tasks t
-                    LEFT JOIN customers c ON c.id = t.customer_id
-                    LEFT JOIN alerts a ON a.id = t.alert_id
-                    WHERE t.updated_at > %s
-                    ORDER BY t.updated_at ASC
-                    LIMIT 20
-                    """,
-                    (last_updated,),
-                )
-
-                rows = await cur.fetchall()
-
-                if rows:
-                    for row in rows:
-                        data = dict(row)
-                        # Convert types for JSON serialization
-                        if data.get("customer_id"):
-                            data["customer_id"] = str(data["customer_id"])
-                        if data.get("created_at"):
-                            data["created_at"] = data["created_at"].isoformat()
-                        if data.get("updated_at"):
-                            data["updated_at"] = data["updated_at"].isoformat()
-                        if data.get("due_date"):
-                            data["due_date"] = data["due_date"].isoformat()
-                        if data.get("claimed_at"):
-                            data["claimed_at"] = data["claimed_at"].isoformat()
-                        if data.get("completed_at"):
-                            data["completed_at"] = data["completed_at"].isoformat()
-                        if data.get("details") is None:
-                            data["details"] = {}
-
-                        yield f"data: {json.dumps(data)}\n\n"
-                        last_updated = row["updated_at"]
-
-            # Check for task updates every second
-            await asyncio.sleep(1)
-
-    except asyncio.CancelledError:
-        pass
+    return _subscribe(task_hub)
 
 
 @router.get("/stream/tasks")
-async def stream_tasks(conn: AsyncConnection = Depends(connection)):
+async def stream_tasks(request: Request):
     """
     Server-Sent Events endpoint for real-time task updates
 
@@ -251,12 +480,11 @@ async def stream_tasks(conn: AsyncConnection = Depends(connection)):
             console.log(task);
         };
     """
-    return StreamingResponse(
-        generate_task_stream(conn),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache, no-store, must-revalidate",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
-    )
+    return _sse_response(request, generate_task_stream())
+
+
+async def stop_stream_hubs() -> None:
+    """Cancel the hub listeners (called on application shutdown)"""
+    await transaction_hub.stop()
+    await alert_hub.stop()
+    await task_hub.stop()
@@ -1,20 +1,33 @@
 """
 Task Management API endpoints
 """
+import asyncio
+import base64
+import logging
 import os
+import re
+import time
 import uuid as uuid_module
-from datetime import datetime
+from collections import OrderedDict
+from datetime import datetime, timezone
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, status
-from fastapi.responses import StreamingResponse
+import orjson
+from botocore.exceptions import ClientError
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile, File, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, RedirectResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from psycopg import AsyncConnection
-from psycopg.rows import dict_row
+from psycopg.rows import class_row, dict_row, scalar_row
 from psycopg.types.json import Jsonb
-from io import BytesIO
+from pydantic import TypeAdapter, ValidationError
+from temporalio.common import WorkflowIDReusePolicy
+from temporalio.exceptions import WorkflowAlreadyStartedError
 
-from .db import connection
+from .db import connection, get_pool
 from .models import (
     Task,
     TaskCreate,
@@ -25,6 +38,9 @@ from .models import (
     TaskNote,
     TaskNoteCreate,
     TaskAttachment,
+    TaskAttachmentConfirm,
+    TaskAttachmentPresign,
+    TaskAttachmentPresignRequest,
     TaskStatusHistory,
     TaskDefinition,
     TaskDefinitionCreate,
@@ -32,12 +48,260 @@ from .models import (
     TASK_TYPES,
     TASK_STATUSES,
     TASK_PRIORITIES,
+    TASK_TYPES_SET,
+    TASK_STATUSES_SET,
+    TASK_PRIORITIES_SET,
 )
 from . import s3
 
+logger = logging.getLogger(__name__)
+
 # File upload configuration
 MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", 10 * 1024 * 1024))  # 10MB
-ALLOWED_EXTENSIONS = {".pdf", ".doc", ".docx", ".xls", ".xlsx", ".png", ".jpg", ".jpeg", ".txt", ".csv"}
+STREAM_CHUNK_SIZE = 64 * 1024
+PRESIGNED_URL_EXPIRES = int(os.getenv("PRESIGNED_URL_EXPIRES", 900))
+# Added to a presigned POST's expiry to cover clock skew with the storage server
+PRESIGNED_POST_SLACK = 60
+# A single byte range; multi-range requests get the whole file (RFC 7233)
+SINGLE_BYTE_RANGE = re.compile(r"bytes=(\d+-\d*|-\d+)")
+# Lowercase, without the leading dot (see _file_extension)
+ALLOWED_EXTENSIONS = frozenset({"pdf", "doc", "docx", "xls", "xlsx", "png", "jpg", "jpeg", "txt", "csv"})
+
+# Seconds after which an unfinished STARTING reservation (see
+# start_task_workflow) may be taken over by a new request
+WORKFLOW_RESERVATION_TIMEOUT = int(os.getenv("WORKFLOW_RESERVATION_TIMEOUT", 60))
+
+# Temporal workflow started for each task type
+TASK_WORKFLOWS = {
+    "investigation": "InvestigationWorkflow",
+    "kyc_refresh": "KycRefreshWorkflow",
+    "document_request": "DocumentRequestWorkflow",
+    "escalation": "EscalationWorkflow",
+    "sar_filing": "SarFilingWorkflow",
+}
+
+# Validation messages are fixed, so build them once
+INVALID_TASK_TYPE = f"Invalid task_type. Must be one of: {TASK_TYPES}"
+INVALID_STATUS = f"Invalid status. Must be one of: {TASK_STATUSES}"
+INVALID_PRIORITY = f"Invalid priority. Must be one of: {TASK_PRIORITIES}"
+INVALID_DEFAULT_PRIORITY = f"Invalid default_priority. Must be one of: {TASK_PRIORITIES}"
+INVALID_FILE_TYPE = f"File type not allowed. Allowed: {sorted(ALLOWED_EXTENSIONS)}"
+
+# Read paths let Postgres build the task JSON (the Task model shape) from the
+# tasks_enriched view in one pass; rows are returned as-is instead of going
+# through Task(**row)
+TASK_JSON_COLUMN = """
+    (to_jsonb(t) - 'priority_rank' - 'update_seq' - 'update_xid')
+        || jsonb_build_object('details', COALESCE(t.details, '{}'::jsonb))
+"""
+
+# Write paths return the same task JSON straight from the modified row
+TASK_RETURNING = """
+    RETURNING (to_jsonb(tasks) - 'priority_rank' - 'update_seq' - 'update_xid')
+        || jsonb_build_object('details', COALESCE(tasks.details, '{}'::jsonb)) AS task
+"""
+
+# PATCH semantics in one statement: NULL parameters keep the current value
+UPDATE_TASK_SQL = f"""
+    UPDATE tasks
+    SET status = COALESCE(%(status)s::text, status),
+        completed_at = CASE WHEN %(status)s::text = 'completed' THEN NOW() ELSE completed_at END,
+        priority = COALESCE(%(priority)s::text, priority),
+        title = COALESCE(%(title)s::text, title),
+        description = COALESCE(%(description)s::text, description),
+        due_date = COALESCE(%(due_date)s::timestamptz, due_date),
+        resolution_notes = COALESCE(%(resolution_notes)s::text, resolution_notes)
+    WHERE id = %(id)s
+    {TASK_RETURNING}
+"""
+
+# One query text for every filter combination, so a single prepared plan
+# serves all list requests; unset filters are passed as NULL. The page is
+# aggregated into a single JSON document in Postgres and sent to the client
+# as-is, with no per-row Python objects.
+#
+# Pages are keyset-paginated on the full sort key (id breaks ties between
+# tasks created in the same transaction). The query also returns the row
+# count and the sort key of the last row, which becomes the next cursor.
+# due_date sorts NULLS LAST, hence the explicit expansion of "after".
+LIST_TASKS_SQL = f"""
+    SELECT
+        COALESCE(
+            json_agg(page.j ORDER BY page.priority_rank, page.due_date ASC NULLS LAST,
+                     page.created_at DESC, page.id DESC),
+            '[]'
+        )::text AS body,
+        count(*) AS row_count,
+        (json_agg(json_build_array(page.priority_rank, page.due_date, page.created_at, page.id)
+                  ORDER BY page.priority_rank, page.due_date ASC NULLS LAST,
+                           page.created_at DESC, page.id DESC) -> -1)::text AS last_key
+    FROM (
+        SELECT {TASK_JSON_COLUMN} AS j, t.priority_rank, t.due_date, t.created_at, t.id
+        FROM tasks_enriched t
+        WHERE (%(status)s::text IS NULL OR t.status = %(status)s)
+          AND (%(task_type)s::text IS NULL OR t.task_type = %(task_type)s)
+          AND (%(priority)s::text IS NULL OR t.priority = %(priority)s)
+          AND (%(customer_id)s::uuid IS NULL OR t.customer_id = %(customer_id)s)
+          AND (%(claimed_by)s::text IS NULL OR t.claimed_by = %(claimed_by)s)
+          AND (NOT %(unclaimed_only)s OR (t.claimed_by IS NULL AND t.status = 'pending'))
+          AND (%(after_rank)s::smallint IS NULL
+               OR t.priority_rank > %(after_rank)s
+               OR (t.priority_rank = %(after_rank)s AND (
+                   (%(after_due)s::timestamptz IS NOT NULL
+                    AND (t.due_date > %(after_due)s OR t.due_date IS NULL))
+                   OR (t.due_date IS NOT DISTINCT FROM %(after_due)s::timestamptz AND (
+                       t.created_at < %(after_created)s::timestamptz
+                       OR (t.created_at = %(after_created)s::timestamptz AND t.id < %(after_id)s::bigint))))))
+        ORDER BY t.priority_rank, t.due_date ASC NULLS LAST, t.created_at DESC, t.id DESC
+        LIMIT %(limit)s
+    ) page
+"""
+
+# Fixed statements for the hot per-row endpoints, executed with prepare=True so
+# Postgres parses and plans them once per connection
+GET_TASK_SQL = f"SELECT {TASK_JSON_COLUMN} FROM tasks_enriched t WHERE t.id = %s"
+
+TASK_EXISTS_SQL = "SELECT id FROM tasks WHERE id = %s"
+
+RELEASE_TASK_SQL = f"""
+    UPDATE tasks
+    SET claimed_by_id = NULL,
+        claimed_by = NULL,
+        claimed_at = NULL,
+        status = 'pending'
+    WHERE id = %s AND status = 'in_progress'
+    {TASK_RETURNING}
+"""
+
+# completed_by is the user's email when an ID is given and found,
+# otherwise the free-text completed_by
+COMPLETE_TASK_SQL = f"""
+    UPDATE tasks
+    SET status = 'completed',
+        completed_at = NOW(),
+        completed_by = COALESCE(
+            (SELECT email FROM users WHERE id = %(user_id)s::uuid),
+            %(completed_by)s
+        ),
+        resolution_notes = COALESCE(%(resolution_notes)s, resolution_notes)
+    WHERE id = %(task_id)s
+    {TASK_RETURNING}
+"""
+
+# Notes and history are aggregated into a single JSON array in Postgres, like
+# the task list. Selecting from tasks doubles as the existence check: no row
+# means the task does not exist.
+LIST_TASK_NOTES_SQL = """
+    SELECT COALESCE((
+        SELECT json_agg(x ORDER BY x.created_at DESC)
+        FROM (
+            SELECT n.*, u.full_name as user_name
+            FROM task_notes n
+            LEFT JOIN users u ON u.id = n.user_id
+            WHERE n.task_id = t.id
+        ) x
+    ), '[]')::text
+    FROM tasks t
+    WHERE t.id = %s
+"""
+
+LIST_TASK_HISTORY_SQL = """
+    SELECT COALESCE((
+        SELECT json_agg(x ORDER BY x.created_at DESC)
+        FROM (
+            SELECT h.*, u.full_name as changed_by_name
+            FROM task_status_history h
+            LEFT JOIN users u ON u.id = h.changed_by
+            WHERE h.task_id = t.id
+        ) x
+    ), '[]')::text
+    FROM tasks t
+    WHERE t.id = %s
+"""
+
+# Projections follow the response models, so columns the API never returns
+# are neither serialized by Postgres nor decoded by psycopg
+TASK_DEFINITION_COLUMNS = ", ".join(TaskDefinition.model_fields)
+
+TASK_ATTACHMENT_COLUMNS = ", ".join(
+    f"a.{name}" for name in TaskAttachment.model_fields if name != "user_name"
+)
+
+LIST_TASK_ATTACHMENTS_SQL = f"""
+    SELECT COALESCE((
+        SELECT json_agg(x ORDER BY x.created_at DESC)
+        FROM (
+            SELECT {TASK_ATTACHMENT_COLUMNS}, u.full_name as user_name
+            FROM task_attachments a
+            LEFT JOIN users u ON u.id = a.user_id
+            WHERE a.task_id = t.id
+        ) x
+    ), '[]')::text
+    FROM tasks t
+    WHERE t.id = %s
+"""
+
+# Attachment metadata for downloads; file_path holds the S3 key
+GET_TASK_ATTACHMENT_SQL = """
+    SELECT file_path, file_size, original_filename, content_type, upload_expires_at
+    FROM task_attachments
+    WHERE id = %s AND task_id = %s
+"""
+
+GET_TASK_DEFINITION_SQL = f"SELECT {TASK_DEFINITION_COLUMNS} FROM task_definitions WHERE id = %s"
+
+LIST_TASK_DEFINITIONS_SQL = (
+    f"SELECT {TASK_DEFINITION_COLUMNS} FROM task_definitions WHERE NOT %s OR enabled ORDER BY id"
+)
+
+# Same PATCH semantics as UPDATE_TASK_SQL: one statement for every patch shape
+UPDATE_TASK_DEFINITION_SQL = f"""
+    UPDATE task_definitions
+    SET alert_severity = COALESCE(%(alert_severity)s::text[], alert_severity),
+        task_type = COALESCE(%(task_type)s::text, task_type),
+        default_priority = COALESCE(%(default_priority)s::text, default_priority),
+        due_date_offset_hours = COALESCE(%(due_date_offset_hours)s::integer, due_date_offset_hours),
+        title_template = COALESCE(%(title_template)s::text, title_template),
+        description_template = COALESCE(%(description_template)s::text, description_template),
+        enabled = COALESCE(%(enabled)s::boolean, enabled),
+        auto_start_workflow = COALESCE(%(auto_start_workflow)s::boolean, auto_start_workflow)
+    WHERE id = %(id)s
+    RETURNING {TASK_DEFINITION_COLUMNS}
+"""
+
+# Optional in-process cache for single task reads, off by default. Only the
+# writes in this module drop entries; workflow activities, start_alert_workflow
+# and other uvicorn workers also update tasks, so a cached task can be stale
+# until it expires. Leave TASK_CACHE_TTL at 0 until a shared store backs it.
+TASK_CACHE_TTL = float(os.getenv("TASK_CACHE_TTL", 0))
+TASK_CACHE_SIZE = 1024
+_task_cache: dict[int, tuple[float, dict]] = {}
+
+# Temporal describe() results are reused for a few seconds so UI polling of
+# /workflow-status makes at most one RPC per workflow run per TTL
+WORKFLOW_STATUS_CACHE_TTL = float(os.getenv("WORKFLOW_STATUS_CACHE_TTL", 3))
+WORKFLOW_STATUS_CACHE_SIZE = 1024
+_workflow_status_cache: dict[tuple[str, Optional[str]], tuple[float, dict]] = {}
+
+# Task definitions change rarely, so the definition list is cached in-process
+# per enabled_only flag. Writes through this API clear it once committed and
+# bump the generation, so a list read that raced the write is not cached;
+# other workers see changes after at most DEFINITIONS_CACHE_TTL seconds.
+DEFINITIONS_CACHE_TTL = int(os.getenv("DEFINITIONS_CACHE_TTL", 60))
+_definitions_cache: dict[bool, tuple[float, list[dict]]] = {}
+_definitions_generation = 0
+
+# Small attachments are kept in an in-process LRU keyed by S3 key, so repeat
+# downloads skip S3. Keys embed a fresh UUID and only objects that can no
+# longer be rewritten are cached (see _upload_settled), so entries only leave
+# on eviction or when the attachment is deleted.
+ATTACHMENT_CACHE_BYTES = int(os.getenv("ATTACHMENT_CACHE_BYTES", 128 * 1024 * 1024))
+ATTACHMENT_CACHE_ITEM_MAX = int(os.getenv("ATTACHMENT_CACHE_ITEM_MAX", 2 * 1024 * 1024))
+_attachment_cache: OrderedDict[str, bytes] = OrderedDict()
+_attachment_cache_bytes = 0
+# In-flight S3 reads, so concurrent misses for one key share a single fetch
+_attachment_fetches: dict[str, asyncio.Future] = {}
+
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 definition_router = APIRouter(prefix="/task-definitions", tags=["task-definitions"])
@@ -47,6 +311,71 @@ definition_router = APIRouter(prefix="/task-definitions", tags=["task-definition
 # TASK ENDPOINTS
 # =============================================================================
 
+def _is_int(value, bits: int) -> bool:
+    # bool is an int subclass but never a valid key part
+    return (
+        isinstance(value, int)
+        and not isinstance(value, bool)
+        and -(1 << (bits - 1)) <= value < 1 << (bits - 1)
+    )
+
+
+def _is_timestamp(value) -> bool:
+    if not isinstance(value, str):
+        return False
+    try:
+        datetime.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _decode_cursor(after: str) -> list:
+    """
+    Decode an X-Next-Cursor value into [priority_rank, due_date, created_at, id]
+    Anything that would not survive the casts in LIST_TASKS_SQL is a 400
+    """
+    try:
+        key = orjson.loads(base64.urlsafe_b64decode(after))
+    except ValueError:
+        key = None
+    if (
+        not isinstance(key, list)
+        or len(key) != 4
+        or not _is_int(key[0], 16)
+        or not (key[1] is None or _is_timestamp(key[1]))
+        or not _is_timestamp(key[2])
+        or not _is_int(key[3], 64)
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
+
+
+def _json_body(model):
+    """Dependency validating the raw request body against model in one pass
+
+    pydantic-core parses the JSON bytes directly into the model, skipping the
+    json.loads dict that FastAPI's body parameters are validated from. Errors
+    are raised in FastAPI's own 422 format.
+    """
+    adapter = TypeAdapter(model)
+
+    async def parse(request: Request):
+        try:
+            return adapter.validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+            )
+
+    return parse
+
+
+def _json_body_schema(schema: dict) -> dict:
+    """openapi_extra documenting a body read through _json_body"""
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": schema}}}}
+
+
 @router.get("", response_model=List[Task])
 async def list_tasks(
     status_filter: Optional[str] = Query(None, alias="status"),
@@ -56,121 +385,92 @@ async def list_tasks(
     claimed_by: Optional[str] = Query(None),
     unclaimed_only: bool = Query(False),
     limit: int = Query(100, le=500),
+    after: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     conn: AsyncConnection = Depends(connection),
-) -> List[Task]:
+):
     """List tasks with optional filters"""
-    clauses = []
-    params: list = []
-
-    if status_filter:
-        clauses.append("t.status = %s")
-        params.append(status_filter)
-    if task_type:
-        clauses.append("t.task_type = %s")
-        params.append(task_type)
-    if priority:
-        clauses.append("t.priority = %s")
-        params.append(priority)
-    if customer_id:
-        clauses.append("t.customer_id = %s")
-        params.append(customer_id)
-    if claimed_by:
-        clauses.append("t.claimed_by = %s")
-        params.append(claimed_by)
-    if unclaimed_only:
-        clauses.append("t.claimed_by IS NULL AND t.status = 'pending'")
-
-    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
-
-    query = f"""
-        SELECT t.*,
-               COALESCE(c.first_name || ' ' || c.last_name, c.full_name) as customer_name,
-               c.risk_level as customer_risk_level,
-               a.scenario as alert_scenario,
-               a.severity as alert_severity,
-               u_assigned.full_name as assigned_to_name,
-               u_claimed.full_name as claimed_by_name
-        FROM tasks t
-        LEFT JOIN customers c ON c.id = t.customer_id
-        LEFT JOIN alerts a ON a.id = t.alert_id
-        LEFT JOIN users u_assigned ON u_assigned.id = t.assigned_to
-        LEFT JOIN users u_claimed ON u_claimed.id = t.claimed_by_id
-        {where}
-        ORDER BY
-            CASE t.priority
-                WHEN 'critical' THEN 1
-                WHEN 'high' THEN 2
-                WHEN 'medium' THEN 3
-                ELSE 4
-            END,
-            t.due_date ASC NULLS LAST,
-            t.created_at DESC
-        LIMIT %s
-    """
-    params.append(limit)
+    after_key = _decode_cursor(after) if after else [None, None, None, None]
+
+    params = {
+        "status": status_filter or None,
+        "task_type": task_type or None,
+        "priority": priority or None,
+        "customer_id": customer_id,
+        "claimed_by": claimed_by or None,
+        "unclaimed_only": unclaimed_only,
+        "limit": limit,
+        "after_rank": after_key[0],
+        "after_due": after_key[1],
+        "after_created": after_key[2],
+        "after_id": after_key[3],
+    }
 
     async with conn.cursor(row_factory=dict_row) as cur:
-        await cur.execute(query, params)
-        rows = await cur.fetchall()
+        await cur.execute(LIST_TASKS_SQL, params, prepare=True)
+        page = await cur.fetchone()
 
-    return [Task(**_serialize_task(row)) for row in rows]
+    headers = {}
+    if page["last_key"] and page["row_count"] == limit:
+        headers["X-Next-Cursor"] = base64.urlsafe_b64encode(page["last_key"].encode()).decode()
+    return Response(content=page["body"], media_type="application/json", headers=headers)
 
 
 @router.get("/{task_id}", response_model=Task)
 async def get_task(
     task_id: int,
     conn: AsyncConnection = Depends(connection)
-) -> Task:
+):
     """Get a specific task by ID"""
-    async with conn.cursor(row_factory=dict_row) as cur:
-        await cur.execute("""
-            SELECT t.*,
-                   COALESCE(c.first_name || ' ' || c.last_name, c.full_name) as customer_name,
-                   c.risk_level as customer_risk_level,
-                   a.scenario as alert_scenario,
-                   a.severity as alert_severity,
-                   u_assigned.full_name as assigned_to_name,
-                   u_claimed.full_name as claimed_by_name
-            FROM tasks t
-            LEFT JOIN customers c ON c.id = t.customer_id
-            LEFT JOIN alerts a ON a.id = t.alert_id
-            LEFT JOIN users u_assigned ON u_assigned.id = t.assigned_to
-            LEFT JOIN users u_claimed ON u_claimed.id = t.claimed_by_id
-            WHERE t.id = %s
-        """, (task_id,))
+    if TASK_CACHE_TTL > 0:
+        cached = _task_cache.get(task_id)
+        if cached and cached[0] > time.monotonic():
+            return ORJSONResponse(content=cached[1])
+
+    async with conn.cursor(row_factory=scalar_row) as cur:
+        await cur.execute(GET_TASK_SQL, (task_id,), prepare=True)
         row = await cur.fetchone()
         if not row:
             raise HTTPException(status_code=404, detail="Task not found")
 
-    return Task(**_serialize_task(row))
+    if TASK_CACHE_TTL > 0:
+        if len(_task_cache) >= TASK_CACHE_SIZE:
+            # Evict the oldest entry (dicts keep insertion order)
+            del _task_cache[next(iter(_task_cache))]
+        _task_cache[task_id] = (time.monotonic() + TASK_CACHE_TTL, row)
+    return ORJSONResponse(content=row)
 
 
-@router.post("", response_model=Task, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "",
+    response_model=Task,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=_json_body_schema(TaskCreate.model_json_schema()),
+)
 async def create_task(
-    payload: TaskCreate,
+    payload: TaskCreate = Depends(_json_body(TaskCreate)),
     created_by: str = Query(..., description="Username creating the task"),
     conn: AsyncConnection = Depends(connection),
-) -> Task:
+):
     """Create a new task manually"""
     # Validate task_type and priority
-    if payload.task_type not in TASK_TYPES:
+    if payload.task_type not in TASK_TYPES_SET:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid task_type. Must be one of: {TASK_TYPES}"
+            detail=INVALID_TASK_TYPE
         )
-    if payload.priority not in TASK_PRIORITIES:
+    if payload.priority not in TASK_PRIORITIES_SET:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid priority. Must be one of: {TASK_PRIORITIES}"
+            detail=INVALID_PRIORITY
         )
 
-    query = """
+    query = f"""
         INSERT INTO tasks (
             customer_id, alert_id, task_type, priority,
             title, description, due_date, details, created_by
         )
         VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        RETURNING *
+        {TASK_RETURNING}
     """
     async with conn.cursor(row_factory=dict_row) as cur:
         await cur.execute(
@@ -189,7 +489,7 @@ async def create_task(
         )
         row = await cur.fetchone()
 
-    return Task(**_serialize_task(row))
+    return ORJSONResponse(content=row["task"], status_code=status.HTTP_201_CREATED)
 
 
 @router.patch("/{task_id}", response_model=Task)
@@ -197,53 +497,41 @@ async def update_task(
     task_id: int,
     payload: TaskUpdate,
     conn: AsyncConnection = Depends(connection),
-) -> Task:
+):
     """Update a task"""
-    # Build dynamic update
-    updates = {}
-    if payload.status is not None:
-        if payload.status not in TASK_STATUSES:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid status. Must be one of: {TASK_STATUSES}"
-            )
-        updates["status"] = payload.status
-        if payload.status == "completed":
-            updates["completed_at"] = datetime.utcnow()
-    if payload.priority is not None:
-        if payload.priority not in TASK_PRIORITIES:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid priority. Must be one of: {TASK_PRIORITIES}"
-            )
-        updates["priority"] = payload.priority
-    if payload.title is not None:
-        updates["title"] = payload.title
-    if payload.description is not None:
-        updates["description"] = payload.description
-    if payload.due_date is not None:
-        updates["due_date"] = payload.due_date
-    if payload.resolution_notes is not None:
-        updates["resolution_notes"] = payload.resolution_notes
-
-    if not updates:
-        return await get_task(task_id, conn)
+    if payload.status is not None and payload.status not in TASK_STATUSES_SET:
+        raise HTTPException(
+            status_code=400,
+            detail=INVALID_STATUS
+        )
+    if payload.priority is not None and payload.priority not in TASK_PRIORITIES_SET:
+        raise HTTPException(
+            status_code=400,
+            detail=INVALID_PRIORITY
+        )
 
-    set_clause = ", ".join(f"{field} = %s" for field in updates.keys())
-    params = list(updates.values()) + [task_id]
+    params = {
+        "id": task_id,
+        "status": payload.status,
+        "priority": payload.priority,
+        "title": payload.title,
+        "description": payload.description,
+        "due_date": payload.due_date,
+        "resolution_notes": payload.resolution_notes,
+    }
+
+    # Nothing to change: don't write a new row version (and wake the stream)
+    if all(value is None for key, value in params.items() if key != "id"):
+        return await get_task(task_id, conn)
 
-    query = f"""
-        UPDATE tasks SET {set_clause}
-        WHERE id = %s
-        RETURNING *
-    """
     async with conn.cursor(row_factory=dict_row) as cur:
-        await cur.execute(query, params)
+        await cur.execute(UPDATE_TASK_SQL, params, prepare=True)
         row = await cur.fetchone()
         if not row:
             raise HTTPException(status_code=404, detail="Task not found")
 
-    return Task(**_serialize_task(row))
+    _task_cache.pop(task_id, None)
+    return ORJSONResponse(content=row["task"])
 
 
 @router.post("/{task_id}/claim", response_model=Task)
@@ -251,62 +539,72 @@ async def claim_task(
     task_id: int,
     payload: TaskClaim,
     conn: AsyncConnection = Depends(connection),
-) -> Task:
+):
     """Claim a task from the shared queue"""
+    # Validate the user and task and claim it in one round trip; the user/task
+    # lookups explain why nothing was updated
     async with conn.cursor(row_factory=dict_row) as cur:
-        # Verify user exists
-        await cur.execute("SELECT id, email FROM users WHERE id = %s", (str(payload.claimed_by_id),))
-        user = await cur.fetchone()
-        if not user:
-            raise HTTPException(status_code=400, detail="User not found")
+        await cur.execute(f"""
+            WITH u AS (
+                SELECT id, email FROM users WHERE id = %(user_id)s
+            ),
+            existing AS (
+                SELECT claimed_by_id, status FROM tasks WHERE id = %(task_id)s
+            ),
+            claimed AS (
+                UPDATE tasks
+                SET claimed_by_id = u.id,
+                    claimed_by = u.email,
+                    claimed_at = NOW(),
+                    status = 'in_progress'
+                FROM u
+                WHERE tasks.id = %(task_id)s
+                  AND (tasks.claimed_by_id IS NULL OR tasks.claimed_by_id = u.id)
+                  AND tasks.status IN ('pending', 'in_progress')
+                {TASK_RETURNING}
+            )
+            SELECT
+                (SELECT task FROM claimed) AS task,
+                EXISTS (SELECT 1 FROM u) AS user_found,
+                EXISTS (SELECT 1 FROM existing) AS task_found,
+                (SELECT claimed_by_id FROM existing) AS claimed_by_id,
+                (SELECT status FROM existing) AS status
+        """, {"user_id": str(payload.claimed_by_id), "task_id": task_id})
+        row = await cur.fetchone()
 
-        # Check if task exists and is claimable
-        await cur.execute("SELECT * FROM tasks WHERE id = %s", (task_id,))
-        task = await cur.fetchone()
-        if not task:
+    if row["task"] is None:
+        if not row["user_found"]:
+            raise HTTPException(status_code=400, detail="User not found")
+        if not row["task_found"]:
             raise HTTPException(status_code=404, detail="Task not found")
-        if task["claimed_by_id"] and task["claimed_by_id"] != payload.claimed_by_id:
+        if row["claimed_by_id"] and row["claimed_by_id"] != payload.claimed_by_id:
             raise HTTPException(
                 status_code=409,
                 detail="Task already claimed by another user"
             )
-        if task["status"] not in ("pending", "in_progress"):
+        if row["status"] not in ("pending", "in_progress"):
             raise HTTPException(
                 status_code=400,
                 detail="Cannot claim completed task"
             )
+        # Claimed by someone else between our snapshot and the update
+        raise HTTPException(
+            status_code=409,
+            detail="Task already claimed by another user"
+        )
 
-        # Claim the task
-        await cur.execute("""
-            UPDATE tasks
-            SET claimed_by_id = %s,
-                claimed_by = %s,
-                claimed_at = NOW(),
-                status = 'in_progress'
-            WHERE id = %s
-            RETURNING *
-        """, (str(payload.claimed_by_id), user["email"], task_id))
-        row = await cur.fetchone()
-
-    return Task(**_serialize_task(row))
+    _task_cache.pop(task_id, None)
+    return ORJSONResponse(content=row["task"])
 
 
 @router.post("/{task_id}/release", response_model=Task)
 async def release_task(
     task_id: int,
     conn: AsyncConnection = Depends(connection),
-) -> Task:
+):
     """Release a claimed task back to the queue"""
     async with conn.cursor(row_factory=dict_row) as cur:
-        await cur.execute("""
-            UPDATE tasks
-            SET claimed_by_id = NULL,
-                claimed_by = NULL,
-                claimed_at = NULL,
-                status = 'pending'
-            WHERE id = %s AND status = 'in_progress'
-            RETURNING *
-        """, (task_id,))
+        await cur.execute(RELEASE_TASK_SQL, (task_id,), prepare=True)
         row = await cur.fetchone()
         if not row:
             raise HTTPException(
@@ -314,7 +612,8 @@ async def release_task(
                 detail="Task not found or not in progress"
             )
 
-    return Task(**_serialize_task(row))
+    _task_cache.pop(task_id, None)
+    return ORJSONResponse(content=row["task"])
 
 
 @router.post("/{task_id}/complete", response_model=Task)
@@ -322,32 +621,21 @@ async def complete_task(
     task_id: int,
     payload: TaskComplete,
     conn: AsyncConnection = Depends(connection),
-) -> Task:
+):
     """Mark a task as completed"""
-    # Get completed_by string from user if ID provided
-    completed_by_str = payload.completed_by
-    if payload.completed_by_id:
-        async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute("SELECT email FROM users WHERE id = %s", (str(payload.completed_by_id),))
-            user = await cur.fetchone()
-            if user:
-                completed_by_str = user["email"]
-
     async with conn.cursor(row_factory=dict_row) as cur:
-        await cur.execute("""
-            UPDATE tasks
-            SET status = 'completed',
-                completed_at = NOW(),
-                completed_by = %s,
-                resolution_notes = COALESCE(%s, resolution_notes)
-            WHERE id = %s
-            RETURNING *
-        """, (completed_by_str, payload.resolution_notes, task_id))
+        await cur.execute(COMPLETE_TASK_SQL, {
+            "user_id": str(payload.completed_by_id) if payload.completed_by_id else None,
+            "completed_by": payload.completed_by,
+            "resolution_notes": payload.resolution_notes,
+            "task_id": task_id,
+        }, prepare=True)
         row = await cur.fetchone()
         if not row:
             raise HTTPException(status_code=404, detail="Task not found")
 
-    return Task(**_serialize_task(row))
+    _task_cache.pop(task_id, None)
+    return ORJSONResponse(content=row["task"])
 
 
 @router.post("/{task_id}/assign", response_model=Task)
@@ -355,60 +643,82 @@ async def assign_task(
     task_id: int,
     payload: TaskAssign,
     conn: AsyncConnection = Depends(connection),
-) -> Task:
+):
     """Assign a task to a specific user (manager action)"""
+    # Validate both users and the task and assign it in one round trip
     async with conn.cursor(row_factory=dict_row) as cur:
-        # Verify assignee exists and is active
-        await cur.execute(
-            "SELECT id, email FROM users WHERE id = %s AND is_active = TRUE",
-            (str(payload.assigned_to),)
-        )
-        assignee = await cur.fetchone()
-        if not assignee:
-            raise HTTPException(status_code=400, detail="Assignee not found or inactive")
+        await cur.execute(f"""
+            WITH assignee AS (
+                SELECT id, email FROM users WHERE id = %(assigned_to)s AND is_active = TRUE
+            ),
+            assigner AS (
+                SELECT id FROM users WHERE id = %(assigned_by)s
+            ),
+            existing AS (
+                SELECT status FROM tasks WHERE id = %(task_id)s
+            ),
+            assigned AS (
+                UPDATE tasks
+                SET assigned_to = assignee.id,
+                    assigned_by = assigner.id,
+                    assigned_at = NOW(),
+                    claimed_by_id = assignee.id,
+                    claimed_by = assignee.email,
+                    claimed_at = NOW(),
+                    status = CASE WHEN tasks.status = 'pending' THEN 'in_progress' ELSE tasks.status END
+                FROM assignee, assigner
+                WHERE tasks.id = %(task_id)s
+                  AND tasks.status <> 'completed'
+                {TASK_RETURNING}
+            )
+            SELECT
+                (SELECT task FROM assigned) AS task,
+                EXISTS (SELECT 1 FROM assignee) AS assignee_found,
+                EXISTS (SELECT 1 FROM assigner) AS assigner_found,
+                (SELECT status FROM existing) AS status
+        """, {
+            "assigned_to": str(payload.assigned_to),
+            "assigned_by": str(payload.assigned_by),
+            "task_id": task_id,
+        })
+        row = await cur.fetchone()
 
-        # Verify assigner exists
-        await cur.execute("SELECT id FROM users WHERE id = %s", (str(payload.assigned_by),))
-        if not await cur.fetchone():
+    if row["task"] is None:
+        if not row["assignee_found"]:
+            raise HTTPException(status_code=400, detail="Assignee not found or inactive")
+        if not row["assigner_found"]:
             raise HTTPException(status_code=400, detail="Assigner not found")
-
-        # Check task exists and is assignable
-        await cur.execute("SELECT * FROM tasks WHERE id = %s", (task_id,))
-        task = await cur.fetchone()
-        if not task:
+        if row["status"] is None:
             raise HTTPException(status_code=404, detail="Task not found")
-        if task["status"] == "completed":
-            raise HTTPException(status_code=400, detail="Cannot assign completed task")
+        raise HTTPException(status_code=400, detail="Cannot assign completed task")
+
+    _task_cache.pop(task_id, None)
+    return ORJSONResponse(content=row["task"])
 
-        # Assign the task
-        await cur.execute("""
-            UPDATE tasks
-            SET assigned_to = %s,
-                assigned_by = %s,
-                assigned_at = NOW(),
-                claimed_by_id = %s,
-                claimed_by = %s,
-                claimed_at = NOW(),
-                status = CASE WHEN status = 'pending' THEN 'in_progress' ELSE status END
-            WHERE id = %s
-            RETURNING *
-        """, (
-            str(payload.assigned_to),
-            str(payload.assigned_by),
-            str(payload.assigned_to),
-            assignee["email"],
-            task_id
-        ))
-        row = await cur.fetchone()
 
-    return Task(**_serialize_task(row))
+async def _release_workflow_reservation(task_id: int, workflow_id: str) -> None:
+    """
+    Give up a STARTING reservation so the next request can take it over
+    workflow_id is kept: if Temporal did start the workflow, the retry gets
+    WorkflowAlreadyStartedError for the same id and records its run id.
+    """
+    try:
+        async with get_pool().connection() as conn, conn.pipeline():
+            await conn.execute("""
+                UPDATE tasks
+                SET workflow_status = NULL
+                WHERE id = %s AND workflow_id = %s
+                  AND workflow_run_id IS NULL AND workflow_status = 'STARTING'
+            """, (task_id, workflow_id))
+            await conn.commit()
+    except Exception as e:
+        # The reservation expires after WORKFLOW_RESERVATION_TIMEOUT anyway
+        logger.warning(f"Failed to release workflow reservation for task {task_id}: {e}")
+    _task_cache.pop(task_id, None)
 
 
 @router.post("/{task_id}/start-workflow", response_model=Task)
-async def start_task_workflow(
-    task_id: int,
-    conn: AsyncConnection = Depends(connection),
-) -> Task:
+async def start_task_workflow(task_id: int):
     """Start a Temporal workflow for this task"""
     # Import here to avoid circular imports
     from .main import temporal_client
@@ -419,67 +729,108 @@ async def start_task_workflow(
             detail="Temporal client not connected"
         )
 
-    async with conn.cursor(row_factory=dict_row) as cur:
-        await cur.execute("SELECT * FROM tasks WHERE id = %s", (task_id,))
-        task = await cur.fetchone()
-        if not task:
-            raise HTTPException(status_code=404, detail="Task not found")
-
-        if task["workflow_id"]:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Workflow already started: {task['workflow_id']}"
-            )
-
-        # Map task type to workflow
-        workflow_map = {
-            "investigation": "InvestigationWorkflow",
-            "kyc_refresh": "KycRefreshWorkflow",
-            "document_request": "DocumentRequestWorkflow",
-            "escalation": "EscalationWorkflow",
-            "sar_filing": "SarFilingWorkflow",
-        }
-
-        workflow_name = workflow_map.get(task["task_type"])
-        if not workflow_name:
-            raise HTTPException(
-                status_code=400,
-                detail=f"No workflow defined for task type: {task['task_type']}"
-            )
-
-        # Start workflow
-        workflow_id = f"task-{task_id}-{task['task_type']}-{int(datetime.utcnow().timestamp())}"
+    # Pool connections are taken per statement block rather than through the
+    # connection dependency, so none is held while waiting on Temporal.
+    #
+    # Reserve the workflow slot and read the task in one statement. Marking the
+    # task STARTING before the Temporal call (and committing) keeps a second
+    # request from starting a duplicate workflow while the RPC is in flight.
+    # A workflow only counts as started once its run id is recorded; a
+    # reservation without one is taken over once released or older than
+    # WORKFLOW_RESERVATION_TIMEOUT (the request that made it died), keeping
+    # its workflow_id.
+    #
+    # Each write below is pipelined with its COMMIT, so statement and commit
+    # share one round trip.
+    async with get_pool().connection() as conn:
+        async with conn.cursor(row_factory=dict_row) as cur:
+            async with conn.pipeline():
+                await cur.execute("""
+                    UPDATE tasks
+                    SET workflow_id = COALESCE(
+                            workflow_id,
+                            'task-' || id || '-' || task_type || '-'
+                                || floor(extract(epoch FROM now()))::bigint
+                        ),
+                        workflow_status = 'STARTING'
+                    WHERE id = %s
+                      AND task_type = ANY(%s)
+                      AND workflow_run_id IS NULL
+                      AND (workflow_status IS DISTINCT FROM 'STARTING'
+                           OR updated_at < now() - make_interval(secs => %s))
+                    RETURNING *
+                """, (task_id, list(TASK_WORKFLOWS), WORKFLOW_RESERVATION_TIMEOUT))
+                await conn.commit()
+                task = await cur.fetchone()
+
+            if not task:
+                await cur.execute("SELECT task_type, workflow_id FROM tasks WHERE id = %s", (task_id,))
+                existing = await cur.fetchone()
+                if not existing:
+                    raise HTTPException(status_code=404, detail="Task not found")
+                if existing["task_type"] not in TASK_WORKFLOWS:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"No workflow defined for task type: {existing['task_type']}"
+                    )
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Workflow already started: {existing['workflow_id']}"
+                )
+    _task_cache.pop(task_id, None)
 
+    try:
         try:
             handle = await temporal_client.start_workflow(
-                workflow_name,
+                TASK_WORKFLOWS[task["task_type"]],
                 args=[
                     str(task["customer_id"]) if task["customer_id"] else None,
                     task["id"],
                     dict(task["details"]) if task["details"] else {}
                 ],
-                id=workflow_id,
+                id=task["workflow_id"],
                 task_queue="aml-tasks",
+                # A retry of a reservation whose start did reach Temporal must
+                # not create a second run, even if the first one has finished
+                id_reuse_policy=WorkflowIDReusePolicy.REJECT_DUPLICATE,
             )
-
-            # Update task with workflow info
-            await cur.execute("""
-                UPDATE tasks
-                SET workflow_id = %s,
-                    workflow_run_id = %s,
-                    workflow_status = 'RUNNING'
-                WHERE id = %s
-                RETURNING *
-            """, (handle.id, handle.result_run_id, task_id))
-            row = await cur.fetchone()
-
+            run_id = handle.result_run_id
+        except WorkflowAlreadyStartedError as e:
+            # An earlier attempt started it but never recorded the run id
+            run_id = e.run_id or (
+                await temporal_client.get_workflow_handle(task["workflow_id"]).describe()
+            ).run_id
         except Exception as e:
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to start workflow: {str(e)}"
             )
 
-    return Task(**_serialize_task(row))
+        # Update task with workflow info
+        async with get_pool().connection() as conn:
+            async with conn.cursor(row_factory=dict_row) as cur:
+                async with conn.pipeline():
+                    await cur.execute(f"""
+                        UPDATE tasks
+                        SET workflow_run_id = %s,
+                            workflow_status = 'RUNNING'
+                        WHERE id = %s AND workflow_id = %s
+                        {TASK_RETURNING}
+                    """, (run_id, task_id, task["workflow_id"]))
+                    await conn.commit()
+                    row = await cur.fetchone()
+    except BaseException:
+        # Any failure before the run id is recorded, including cancellation,
+        # releases the reservation. Shielded so a cancelled request still
+        # finishes the release.
+        await asyncio.shield(_release_workflow_reservation(task_id, task["workflow_id"]))
+        raise
+
+    _task_cache.pop(task_id, None)
+    if row is None:
+        # Deleted while the workflow was starting
+        raise HTTPException(status_code=404, detail="Task not found")
+    return ORJSONResponse(content=row["task"])
 
 
 @router.get("/{task_id}/workflow-status")
@@ -497,19 +848,36 @@ async def get_task_workflow_status(
         )
 
     async with conn.cursor(row_factory=dict_row) as cur:
-        await cur.execute(
-            "SELECT workflow_id, workflow_run_id FROM tasks WHERE id = %s",
-            (task_id,)
-        )
+        await cur.execute("""
+            SELECT workflow_id, workflow_run_id, workflow_status,
+                   workflow_status = 'STARTING'
+                       AND updated_at >= now() - make_interval(secs => %s) AS starting
+            FROM tasks
+            WHERE id = %s
+        """, (WORKFLOW_RESERVATION_TIMEOUT, task_id))
         task = await cur.fetchone()
         if not task:
             raise HTTPException(status_code=404, detail="Task not found")
-        if not task["workflow_id"]:
+        # Without a run id the workflow was never started (see
+        # start_task_workflow); workflow_id may only be a reservation
+        if not task["workflow_run_id"]:
+            if task["starting"]:
+                return {
+                    "workflow_id": task["workflow_id"],
+                    "status": "STARTING",
+                    "message": "Workflow start in progress"
+                }
             return {
                 "status": "NO_WORKFLOW",
                 "message": "No workflow started for this task"
             }
 
+    # A cached result was already synced to the task row when it was fetched
+    cache_key = (task["workflow_id"], task["workflow_run_id"])
+    cached = _workflow_status_cache.get(cache_key)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
     try:
         handle = temporal_client.get_workflow_handle(
             task["workflow_id"],
@@ -517,20 +885,30 @@ async def get_task_workflow_status(
         )
         desc = await handle.describe()
 
-        # Update task workflow status
-        async with conn.cursor() as cur:
-            await cur.execute(
-                "UPDATE tasks SET workflow_status = %s WHERE id = %s",
-                (desc.status.name, task_id)
-            )
-
-        return {
+        # Update task workflow status only when it changed; an unchanged
+        # status would still bump updated_at and wake the task stream
+        if desc.status.name != task["workflow_status"]:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    """
+                    UPDATE tasks SET workflow_status = %s
+                    WHERE id = %s AND workflow_status IS DISTINCT FROM %s
+                    """,
+                    (desc.status.name, task_id, desc.status.name)
+                )
+            _task_cache.pop(task_id, None)
+
+        result = {
             "workflow_id": desc.id,
             "run_id": desc.run_id,
             "status": desc.status.name,
             "start_time": desc.start_time.isoformat() if desc.start_time else None,
             "close_time": desc.close_time.isoformat() if desc.close_time else None,
         }
+        if len(_workflow_status_cache) >= WORKFLOW_STATUS_CACHE_SIZE:
+            del _workflow_status_cache[next(iter(_workflow_status_cache))]
+        _workflow_status_cache[cache_key] = (time.monotonic() + WORKFLOW_STATUS_CACHE_TTL, result)
+        return result
     except Exception as e:
         return {
             "status": "ERROR",
@@ -546,54 +924,99 @@ async def get_task_workflow_status(
 async def list_task_notes(
     task_id: int,
     conn: AsyncConnection = Depends(connection),
-) -> List[TaskNote]:
+):
     """List all notes for a task"""
-    async with conn.cursor(row_factory=dict_row) as cur:
-        # Check task exists
-        await cur.execute("SELECT id FROM tasks WHERE id = %s", (task_id,))
-        if not await cur.fetchone():
+    async with conn.cursor(row_factory=scalar_row) as cur:
+        await cur.execute(LIST_TASK_NOTES_SQL, (task_id,), prepare=True)
+        body = await cur.fetchone()
+        if body is None:
             raise HTTPException(status_code=404, detail="Task not found")
 
-        await cur.execute("""
-            SELECT n.*, u.full_name as user_name
-            FROM task_notes n
-            LEFT JOIN users u ON u.id = n.user_id
-            WHERE n.task_id = %s
-            ORDER BY n.created_at DESC
-        """, (task_id,))
-        rows = await cur.fetchall()
-
-    return [TaskNote(**row) for row in rows]
+    return Response(content=body, media_type="application/json")
 
 
-@router.post("/{task_id}/notes", response_model=TaskNote, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/{task_id}/notes",
+    response_model=TaskNote,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=_json_body_schema(TaskNoteCreate.model_json_schema()),
+)
 async def create_task_note(
     task_id: int,
-    payload: TaskNoteCreate,
+    payload: TaskNoteCreate = Depends(_json_body(TaskNoteCreate)),
     conn: AsyncConnection = Depends(connection),
 ) -> TaskNote:
     """Add a note to a task"""
-    async with conn.cursor(row_factory=dict_row) as cur:
-        # Check task exists
-        await cur.execute("SELECT id FROM tasks WHERE id = %s", (task_id,))
-        if not await cur.fetchone():
+    async with conn.cursor(row_factory=dict_row) as cur, conn.cursor(row_factory=dict_row) as user_cur:
+        # The task and user checks are independent: pipeline them into one
+        # round trip
+        async with conn.pipeline():
+            await cur.execute(TASK_EXISTS_SQL, (task_id,), prepare=True)
+            await user_cur.execute("SELECT id, full_name FROM users WHERE id = %s", (str(payload.user_id),))
+            task = await cur.fetchone()
+            user = await user_cur.fetchone()
+        if not task:
             raise HTTPException(status_code=404, detail="Task not found")
-
-        # Verify user exists
-        await cur.execute("SELECT id, full_name FROM users WHERE id = %s", (str(payload.user_id),))
-        user = await cur.fetchone()
         if not user:
             raise HTTPException(status_code=400, detail="User not found")
 
-        # Create note
+        # Create note, building the TaskNote straight from the returned row
+        cur.row_factory = class_row(TaskNote)
         await cur.execute("""
             INSERT INTO task_notes (task_id, user_id, content)
             VALUES (%s, %s, %s)
             RETURNING *, %s as user_name
         """, (task_id, str(payload.user_id), payload.content, user["full_name"]))
-        row = await cur.fetchone()
+        note = await cur.fetchone()
+
+    return note
+
+
+@router.post(
+    "/{task_id}/notes/batch",
+    response_model=List[TaskNote],
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=_json_body_schema({"type": "array", "items": TaskNoteCreate.model_json_schema()}),
+)
+async def create_task_notes_batch(
+    task_id: int,
+    payload: List[TaskNoteCreate] = Depends(_json_body(List[TaskNoteCreate])),
+    conn: AsyncConnection = Depends(connection),
+) -> List[TaskNote]:
+    """Add several notes to a task in one round trip"""
+    if not payload:
+        return []
+
+    user_ids = [str(note.user_id) for note in payload]
+    async with conn.cursor(row_factory=dict_row) as cur, conn.cursor(row_factory=dict_row) as user_cur:
+        # Check the task and all users (with a single lookup) in one
+        # pipelined round trip
+        async with conn.pipeline():
+            await cur.execute(TASK_EXISTS_SQL, (task_id,), prepare=True)
+            await user_cur.execute("SELECT count(*) AS found FROM users WHERE id = ANY(%s::uuid[])", (user_ids,))
+            task = await cur.fetchone()
+            users = await user_cur.fetchone()
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+        if users["found"] != len(set(user_ids)):
+            raise HTTPException(status_code=400, detail="User not found")
 
-    return TaskNote(**row)
+        # Insert every note with one statement, preserving the request order
+        cur.row_factory = class_row(TaskNote)
+        await cur.execute("""
+            WITH inserted AS (
+                INSERT INTO task_notes (task_id, user_id, content)
+                SELECT %s, n.user_id, n.content
+                FROM unnest(%s::uuid[], %s::text[]) WITH ORDINALITY AS n(user_id, content, ord)
+                ORDER BY n.ord
+                RETURNING *
+            )
+            SELECT i.*, u.full_name as user_name
+            FROM inserted i
+            LEFT JOIN users u ON u.id = i.user_id
+            ORDER BY i.id
+        """, (task_id, user_ids, [note.content for note in payload]))
+        return await cur.fetchall()
 
 
 @router.delete("/{task_id}/notes/{note_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -605,10 +1028,10 @@ async def delete_task_note(
     """Delete a task note"""
     async with conn.cursor() as cur:
         await cur.execute(
-            "DELETE FROM task_notes WHERE id = %s AND task_id = %s RETURNING id",
+            "DELETE FROM task_notes WHERE id = %s AND task_id = %s",
             (note_id, task_id)
         )
-        if not await cur.fetchone():
+        if cur.rowcount == 0:
             raise HTTPException(status_code=404, detail="Note not found")
 
 
@@ -620,52 +1043,89 @@ async def delete_task_note(
 async def list_task_history(
     task_id: int,
     conn: AsyncConnection = Depends(connection),
-) -> List[TaskStatusHistory]:
+):
     """List status change history for a task"""
-    async with conn.cursor(row_factory=dict_row) as cur:
-        # Check task exists
-        await cur.execute("SELECT id FROM tasks WHERE id = %s", (task_id,))
-        if not await cur.fetchone():
+    async with conn.cursor(row_factory=scalar_row) as cur:
+        await cur.execute(LIST_TASK_HISTORY_SQL, (task_id,), prepare=True)
+        body = await cur.fetchone()
+        if body is None:
             raise HTTPException(status_code=404, detail="Task not found")
 
-        await cur.execute("""
-            SELECT h.*, u.full_name as changed_by_name
-            FROM task_status_history h
-            LEFT JOIN users u ON u.id = h.changed_by
-            WHERE h.task_id = %s
-            ORDER BY h.created_at DESC
-        """, (task_id,))
-        rows = await cur.fetchall()
-
-    return [TaskStatusHistory(**row) for row in rows]
+    return Response(content=body, media_type="application/json")
 
 
 # =============================================================================
 # TASK ATTACHMENTS ENDPOINTS
 # =============================================================================
 
+def _cache_attachment(s3_key: str, content: bytes) -> None:
+    global _attachment_cache_bytes
+    if s3_key in _attachment_cache:
+        return
+    _attachment_cache[s3_key] = content
+    _attachment_cache_bytes += len(content)
+    while _attachment_cache_bytes > ATTACHMENT_CACHE_BYTES:
+        _, evicted = _attachment_cache.popitem(last=False)
+        _attachment_cache_bytes -= len(evicted)
+
+
+def _uncache_attachment(s3_key: str) -> None:
+    global _attachment_cache_bytes
+    content = _attachment_cache.pop(s3_key, None)
+    if content is not None:
+        _attachment_cache_bytes -= len(content)
+
+
+async def _fetch_attachment(s3_key: str) -> bytes:
+    try:
+        content, _, _ = await run_in_threadpool(s3.download_file, s3_key)
+    finally:
+        _attachment_fetches.pop(s3_key, None)
+    _cache_attachment(s3_key, content)
+    return content
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against etag (RFC 7232)"""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+async def _attachment_content(s3_key: str) -> bytes:
+    """Content of a small attachment, from the LRU or a shared S3 fetch"""
+    content = _attachment_cache.get(s3_key)
+    if content is not None:
+        _attachment_cache.move_to_end(s3_key)
+        return content
+    fetch = _attachment_fetches.get(s3_key)
+    if fetch is None:
+        fetch = _attachment_fetches[s3_key] = asyncio.ensure_future(_fetch_attachment(s3_key))
+    # A disconnecting client must not cancel a fetch other requests wait on
+    return await asyncio.shield(fetch)
+
+
+def _file_extension(filename: str) -> str:
+    """Lowercase extension without the dot, or "" if the name has none"""
+    _, dot, ext = filename.rpartition(".")
+    return ext.lower() if dot else ""
+
+
 @router.get("/{task_id}/attachments", response_model=List[TaskAttachment])
 async def list_task_attachments(
     task_id: int,
     conn: AsyncConnection = Depends(connection),
-) -> List[TaskAttachment]:
+):
     """List all attachments for a task"""
-    async with conn.cursor(row_factory=dict_row) as cur:
-        # Check task exists
-        await cur.execute("SELECT id FROM tasks WHERE id = %s", (task_id,))
-        if not await cur.fetchone():
+    async with conn.cursor(row_factory=scalar_row) as cur:
+        await cur.execute(LIST_TASK_ATTACHMENTS_SQL, (task_id,), prepare=True)
+        body = await cur.fetchone()
+        if body is None:
             raise HTTPException(status_code=404, detail="Task not found")
 
-        await cur.execute("""
-            SELECT a.*, u.full_name as user_name
-            FROM task_attachments a
-            LEFT JOIN users u ON u.id = a.user_id
-            WHERE a.task_id = %s
-            ORDER BY a.created_at DESC
-        """, (task_id,))
-        rows = await cur.fetchall()
-
-    return [TaskAttachment(**row) for row in rows]
+    return Response(content=body, media_type="application/json")
 
 
 @router.post("/{task_id}/attachments", response_model=TaskAttachment, status_code=status.HTTP_201_CREATED)
@@ -673,108 +1133,376 @@ async def upload_task_attachment(
     task_id: int,
     user_id: UUID = Query(..., description="User uploading the file"),
     file: UploadFile = File(...),
-    conn: AsyncConnection = Depends(connection),
-) -> TaskAttachment:
+):
     """Upload an attachment to a task (stored in S3)"""
     # Validate file extension
-    _, ext = os.path.splitext(file.filename or "")
-    if ext.lower() not in ALLOWED_EXTENSIONS:
+    ext = _file_extension(file.filename or "")
+    if ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=400,
-            detail=f"File type not allowed. Allowed: {ALLOWED_EXTENSIONS}"
+            detail=INVALID_FILE_TYPE
         )
 
-    async with conn.cursor(row_factory=dict_row) as cur:
-        # Check task exists
-        await cur.execute("SELECT id FROM tasks WHERE id = %s", (task_id,))
+    # The upload is already spooled by Starlette (in memory up to 1 MiB, then
+    # to a temporary file); check its size and stream it to S3 from there
+    # instead of reading it into memory
+    file_size = file.size
+    if file_size is None:
+        file.file.seek(0, os.SEEK_END)
+        file_size = file.file.tell()
+    if file_size > MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File too large. Max size: {MAX_FILE_SIZE / (1024 * 1024)}MB"
+        )
+    file.file.seek(0)
+
+    # Generate unique filename and S3 key
+    unique_filename = f"{uuid_module.uuid4()}.{ext}"
+    s3_key = f"tasks/{task_id}/{unique_filename}"
+    content_type = file.content_type or "application/octet-stream"
+
+    # Upload to S3 first (boto3 is blocking; keep it off the event loop). No
+    # pool connection is taken until the upload is done, so slow uploads do
+    # not hold database connections.
+    try:
+        await run_in_threadpool(
+            s3.upload_fileobj,
+            file.file,
+            key=s3_key,
+            content_type=content_type,
+            metadata={"original_filename": file.filename or "unknown"},
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to upload file to storage: {str(e)}"
+        )
+
+    # Create database record (file_path stores the S3 key) only if both the
+    # task and the user exist. The returned row comes straight from the table
+    # and is sent as-is.
+    try:
+        async with get_pool().connection() as conn, conn.cursor(row_factory=dict_row) as cur:
+            await cur.execute(f"""
+                WITH a AS (
+                    INSERT INTO task_attachments (task_id, user_id, filename, original_filename, file_path, file_size, content_type)
+                    SELECT t.id, u.id, %(filename)s, %(original_filename)s, %(file_path)s, %(file_size)s, %(content_type)s
+                    FROM tasks t
+                    JOIN users u ON u.id = %(user_id)s
+                    WHERE t.id = %(task_id)s
+                    RETURNING *
+                )
+                SELECT {TASK_ATTACHMENT_COLUMNS}, u.full_name as user_name
+                FROM a
+                JOIN users u ON u.id = a.user_id
+            """, {
+                "task_id": task_id,
+                "user_id": str(user_id),
+                "filename": unique_filename,
+                "original_filename": file.filename,
+                "file_path": s3_key,
+                "file_size": file_size,
+                "content_type": content_type,
+            })
+            attachment = await cur.fetchone()
+            if not attachment:
+                await cur.execute(TASK_EXISTS_SQL, (task_id,), prepare=True)
+                if not await cur.fetchone():
+                    raise HTTPException(status_code=404, detail="Task not found")
+                raise HTTPException(status_code=400, detail="User not found")
+            await conn.commit()
+    except BaseException:
+        # Nothing references the object; remove it rather than leave an orphan
+        await asyncio.shield(run_in_threadpool(s3.delete_file, s3_key))
+        raise
+
+    return ORJSONResponse(content=attachment, status_code=status.HTTP_201_CREATED)
+
+
+@router.post("/{task_id}/attachments/presign", response_model=TaskAttachmentPresign)
+async def presign_task_attachment(
+    task_id: int,
+    payload: TaskAttachmentPresignRequest,
+    conn: AsyncConnection = Depends(connection),
+) -> TaskAttachmentPresign:
+    """Get a presigned POST to upload an attachment straight to S3
+
+    After the upload succeeds, call /attachments/confirm with the returned key
+    to record the attachment.
+    """
+    ext = _file_extension(payload.filename)
+    if ext not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=INVALID_FILE_TYPE
+        )
+
+    s3_key = f"tasks/{task_id}/{uuid_module.uuid4()}.{ext}"
+
+    # Record the pending upload that /attachments/confirm consumes; pending
+    # uploads of this task that were never confirmed are dropped on the way
+    async with conn.cursor() as cur:
+        await cur.execute("""
+            WITH abandoned AS (
+                DELETE FROM task_attachment_uploads
+                WHERE task_id = %(task_id)s AND expires_at < now() - interval '1 day'
+            )
+            INSERT INTO task_attachment_uploads (file_path, task_id, expires_at)
+            SELECT %(key)s, id, now() + make_interval(secs => %(expires_in)s)
+            FROM tasks
+            WHERE id = %(task_id)s
+            RETURNING file_path
+        """, {"task_id": task_id, "key": s3_key, "expires_in": PRESIGNED_URL_EXPIRES + PRESIGNED_POST_SLACK})
         if not await cur.fetchone():
             raise HTTPException(status_code=404, detail="Task not found")
+        await conn.commit()
+
+    post = s3.generate_presigned_post(
+        s3_key,
+        content_type=payload.content_type,
+        max_size=MAX_FILE_SIZE,
+        metadata={"original_filename": payload.filename},
+        expires_in=PRESIGNED_URL_EXPIRES,
+    )
+    return TaskAttachmentPresign(
+        url=post["url"],
+        fields=post["fields"],
+        key=s3_key,
+        expires_in=PRESIGNED_URL_EXPIRES,
+    )
+
+
+@router.post("/{task_id}/attachments/confirm", response_model=TaskAttachment, status_code=status.HTTP_201_CREATED)
+async def confirm_task_attachment(
+    task_id: int,
+    payload: TaskAttachmentConfirm,
+    conn: AsyncConnection = Depends(connection),
+):
+    """Record an attachment uploaded directly to S3 with a presigned POST
 
-        # Verify user exists
-        await cur.execute("SELECT id, full_name FROM users WHERE id = %s", (str(user_id),))
-        user = await cur.fetchone()
+    Only keys handed out by /attachments/presign are accepted, each once.
+    """
+    prefix = f"tasks/{task_id}/"
+    filename = payload.key[len(prefix):]
+    if (
+        not payload.key.startswith(prefix)
+        or "/" in filename
+        or _file_extension(filename) not in ALLOWED_EXTENSIONS
+    ):
+        raise HTTPException(status_code=400, detail="Invalid attachment key")
+
+    # Size, type and original filename come from S3, not from the client; the
+    # presigned POST policy pinned the type and filename
+    info = await run_in_threadpool(s3.get_file_info, payload.key)
+    if not info:
+        raise HTTPException(status_code=400, detail="File not found in storage")
+
+    async with conn.cursor(row_factory=dict_row) as cur, conn.cursor(row_factory=dict_row) as user_cur:
+        async with conn.pipeline():
+            await cur.execute(TASK_EXISTS_SQL, (task_id,), prepare=True)
+            await user_cur.execute("SELECT id, full_name FROM users WHERE id = %s", (str(payload.user_id),))
+            task = await cur.fetchone()
+            user = await user_cur.fetchone()
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
         if not user:
             raise HTTPException(status_code=400, detail="User not found")
 
-        # Read file content
-        content = await file.read()
-        if len(content) > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File too large. Max size: {MAX_FILE_SIZE / (1024 * 1024)}MB"
+        # Consume the pending upload and record the attachment in one
+        # statement; a key that is unknown, already confirmed or uploaded
+        # through the API returns no row
+        await cur.execute(f"""
+            WITH upload AS (
+                DELETE FROM task_attachment_uploads
+                WHERE file_path = %(key)s AND task_id = %(task_id)s
+                RETURNING file_path, expires_at
             )
+            INSERT INTO task_attachments AS a
+                (task_id, user_id, filename, original_filename, file_path, file_size, content_type, upload_expires_at)
+            SELECT %(task_id)s, %(user_id)s, %(filename)s, %(original_filename)s, upload.file_path,
+                   %(file_size)s, %(content_type)s, upload.expires_at
+            FROM upload
+            ON CONFLICT (file_path) DO NOTHING
+            RETURNING {TASK_ATTACHMENT_COLUMNS}, %(user_name)s as user_name
+        """, {
+            "key": payload.key,
+            "task_id": task_id,
+            "user_id": str(payload.user_id),
+            "filename": filename,
+            "original_filename": info.get("Metadata", {}).get("original_filename") or filename,
+            "file_size": info["ContentLength"],
+            "content_type": info.get("ContentType") or "application/octet-stream",
+            "user_name": user["full_name"],
+        })
+        attachment = await cur.fetchone()
+        if not attachment:
+            await cur.execute("SELECT 1 FROM task_attachments WHERE file_path = %s", (payload.key,))
+            if await cur.fetchone():
+                raise HTTPException(status_code=409, detail="Attachment already recorded")
+            raise HTTPException(status_code=400, detail="No pending upload for this key")
+        await conn.commit()
 
-        # Generate unique filename and S3 key
-        unique_filename = f"{uuid_module.uuid4()}{ext}"
-        s3_key = f"tasks/{task_id}/{unique_filename}"
-        content_type = file.content_type or "application/octet-stream"
+    return ORJSONResponse(content=attachment, status_code=status.HTTP_201_CREATED)
 
-        # Upload to S3
-        try:
-            s3.upload_file(
-                content=content,
-                key=s3_key,
-                content_type=content_type,
-                metadata={"original_filename": file.filename or "unknown"},
-            )
-        except Exception as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to upload file to storage: {str(e)}"
-            )
 
-        # Create database record (file_path stores the S3 key)
-        await cur.execute("""
-            INSERT INTO task_attachments (task_id, user_id, filename, original_filename, file_path, file_size, content_type)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            RETURNING *, %s as user_name
-        """, (
-            task_id,
-            str(user_id),
-            unique_filename,
-            file.filename,
-            s3_key,  # Store S3 key as file_path
-            len(content),
-            content_type,
-            user["full_name"]
-        ))
-        row = await cur.fetchone()
-        await conn.commit()
+async def _get_attachment(conn: AsyncConnection, task_id: int, attachment_id: int) -> dict:
+    """Metadata needed to serve an attachment; 404 if it does not exist"""
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await cur.execute(GET_TASK_ATTACHMENT_SQL, (attachment_id, task_id), prepare=True)
+        attachment = await cur.fetchone()
+        if not attachment:
+            raise HTTPException(status_code=404, detail="Attachment not found")
+    return attachment
+
 
-    return TaskAttachment(**row)
+def _upload_settled(attachment: dict) -> bool:
+    """Whether the attachment's object can no longer be rewritten
+
+    Proxied uploads are written once by the API. Direct uploads can be
+    replaced through their presigned POST until its policy expires.
+    """
+    expires_at = attachment["upload_expires_at"]
+    return expires_at is None or expires_at <= datetime.now(timezone.utc)
+
+
+async def _attachment_cache_headers(attachment: dict) -> dict[str, str]:
+    """Validators for an attachment; refreshes attachment["file_size"] from S3 if unsettled"""
+    s3_key = attachment["file_path"]
+    if _upload_settled(attachment):
+        # Every upload gets a fresh UUID key and settled objects are never
+        # rewritten, so the key identifies the content and serves as a strong
+        # validator without asking S3
+        return {
+            "ETag": f'"{s3_key.rpartition("/")[2]}"',
+            "Cache-Control": "private, max-age=300",
+        }
+
+    # The presigned POST can still replace the object: use S3's own ETag and
+    # size, and have clients revalidate every time
+    info = await run_in_threadpool(s3.get_file_info, s3_key)
+    if not info:
+        raise HTTPException(status_code=404, detail="File not found in storage")
+    attachment["file_size"] = info["ContentLength"]
+    return {"ETag": info["ETag"], "Cache-Control": "private, no-cache"}
+
+
+def _range_satisfiable(byte_range: str, size: int) -> bool:
+    """Whether a SINGLE_BYTE_RANGE value overlaps an object of size bytes"""
+    start, _, _ = byte_range.removeprefix("bytes=").partition("-")
+    if start:
+        return int(start) < size
+    # Suffix range ("bytes=-N"): the last N bytes
+    return size > 0 and int(byte_range.rpartition("-")[2]) > 0
+
+
+@router.head("/{task_id}/attachments/{attachment_id}/download")
+async def head_task_attachment(
+    task_id: int,
+    attachment_id: int,
+    conn: AsyncConnection = Depends(connection),
+):
+    """Size, type and validators of a task attachment, answered without S3 once settled"""
+    attachment = await _get_attachment(conn, task_id, attachment_id)
+    cache_headers = await _attachment_cache_headers(attachment)
+    return Response(
+        media_type=attachment["content_type"] or "application/octet-stream",
+        headers={
+            "Content-Disposition": f'attachment; filename="{attachment["original_filename"]}"',
+            "Content-Length": str(attachment["file_size"]),
+            "Accept-Ranges": "bytes",
+            **cache_headers,
+        },
+    )
 
 
 @router.get("/{task_id}/attachments/{attachment_id}/download")
 async def download_task_attachment(
     task_id: int,
     attachment_id: int,
+    request: Request,
+    redirect: bool = Query(False, description="Redirect to a presigned S3 URL instead of proxying the file"),
     conn: AsyncConnection = Depends(connection),
 ):
-    """Download a task attachment from S3"""
-    async with conn.cursor(row_factory=dict_row) as cur:
-        await cur.execute("""
-            SELECT * FROM task_attachments
-            WHERE id = %s AND task_id = %s
-        """, (attachment_id, task_id))
-        attachment = await cur.fetchone()
-        if not attachment:
-            raise HTTPException(status_code=404, detail="Attachment not found")
+    """Download a task attachment from S3, honouring a single-range Range header"""
+    attachment = await _get_attachment(conn, task_id, attachment_id)
 
     # Download from S3
     s3_key = attachment["file_path"]  # file_path stores the S3 key
+    if redirect:
+        url = s3.generate_presigned_url(s3_key, expires_in=PRESIGNED_URL_EXPIRES)
+        return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+
+    # Revalidating clients get a 304 with no body
+    cache_headers = await _attachment_cache_headers(attachment)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, cache_headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+
+    byte_range = request.headers.get("range", "").replace(" ", "")
+    if not SINGLE_BYTE_RANGE.fullmatch(byte_range):
+        byte_range = None
+    # The recorded size is enough to reject a range past the end; S3 is only
+    # asked for ranges it can serve
+    if byte_range and not _range_satisfiable(byte_range, attachment["file_size"]):
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{attachment['file_size']}"},
+        )
+
+    # Whole small settled files come from the in-process cache; ranges, large
+    # files and objects that may still be replaced are streamed from S3
+    if (
+        byte_range is None
+        and attachment["file_size"] <= ATTACHMENT_CACHE_ITEM_MAX
+        and _upload_settled(attachment)
+    ):
+        try:
+            content = await _attachment_content(s3_key)
+        except Exception as e:
+            raise HTTPException(status_code=404, detail=f"File not found in storage: {str(e)}")
+        return Response(
+            content=content,
+            media_type=attachment["content_type"] or "application/octet-stream",
+            headers={
+                "Content-Disposition": f'attachment; filename="{attachment["original_filename"]}"',
+                "Accept-Ranges": "bytes",
+                **cache_headers,
+            },
+        )
+
     try:
-        content, content_type, _ = s3.download_file(s3_key)
+        obj = await run_in_threadpool(s3.open_file, s3_key, byte_range)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") == "InvalidRange":
+            raise HTTPException(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                detail="Requested range not satisfiable",
+                headers={"Content-Range": f"bytes */{attachment['file_size']}"},
+            )
+        raise HTTPException(status_code=404, detail=f"File not found in storage: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=404, detail=f"File not found in storage: {str(e)}")
 
-    # Return as streaming response
+    headers = {
+        "Content-Disposition": f'attachment; filename="{attachment["original_filename"]}"',
+        "Content-Length": str(obj["ContentLength"]),
+        "Accept-Ranges": "bytes",
+        **cache_headers,
+    }
+    if obj.get("ContentRange"):
+        headers["Content-Range"] = obj["ContentRange"]
+
+    # Stream the S3 body through in chunks (iterated in the threadpool by
+    # StreamingResponse) instead of buffering the whole object
+    body = obj["Body"]
     return StreamingResponse(
-        BytesIO(content),
-        media_type=attachment["content_type"] or content_type,
-        headers={
-            "Content-Disposition": f'attachment; filename="{attachment["original_filename"]}"',
-            "Content-Length": str(len(content)),
-        }
+        body.iter_chunks(STREAM_CHUNK_SIZE),
+        status_code=status.HTTP_206_PARTIAL_CONTENT if obj.get("ContentRange") else status.HTTP_200_OK,
+        media_type=attachment["content_type"] or obj.get("ContentType", "application/octet-stream"),
+        headers=headers,
+        background=BackgroundTask(body.close),
     )
 
 
@@ -785,102 +1513,109 @@ async def delete_task_attachment(
     conn: AsyncConnection = Depends(connection),
 ) -> None:
     """Delete a task attachment from S3"""
+    # Delete the database record and get its S3 key in one statement
     async with conn.cursor(row_factory=dict_row) as cur:
         await cur.execute("""
-            SELECT file_path FROM task_attachments
+            DELETE FROM task_attachments
             WHERE id = %s AND task_id = %s
+            RETURNING file_path
         """, (attachment_id, task_id))
         attachment = await cur.fetchone()
         if not attachment:
             raise HTTPException(status_code=404, detail="Attachment not found")
-
-        # Delete file from S3
-        s3_key = attachment["file_path"]  # file_path stores the S3 key
-        try:
-            s3.delete_file(s3_key)
-        except Exception:
-            pass  # Continue even if S3 delete fails
-
-        # Delete database record
-        await cur.execute(
-            "DELETE FROM task_attachments WHERE id = %s",
-            (attachment_id,)
-        )
         await conn.commit()
 
+    # Delete file from S3
+    s3_key = attachment["file_path"]  # file_path stores the S3 key
+    _uncache_attachment(s3_key)
+    try:
+        await run_in_threadpool(s3.delete_file, s3_key)
+    except Exception:
+        pass  # Continue even if S3 delete fails
+
 
 # =============================================================================
 # TASK DEFINITION ENDPOINTS
 # =============================================================================
 
+def _invalidate_definitions() -> None:
+    """Drop cached definition lists; call only after the write has committed"""
+    global _definitions_generation
+    _definitions_generation += 1
+    _definitions_cache.clear()
+
+
 @definition_router.get("", response_model=List[TaskDefinition])
 async def list_task_definitions(
     enabled_only: bool = Query(False),
     conn: AsyncConnection = Depends(connection)
-) -> List[TaskDefinition]:
+):
     """List all task definitions"""
-    where = "WHERE enabled = TRUE" if enabled_only else ""
+    cached = _definitions_cache.get(enabled_only)
+    if cached and cached[0] > time.monotonic():
+        return ORJSONResponse(content=cached[1])
+
+    generation = _definitions_generation
     async with conn.cursor(row_factory=dict_row) as cur:
-        await cur.execute(f"SELECT * FROM task_definitions {where} ORDER BY id")
+        await cur.execute(LIST_TASK_DEFINITIONS_SQL, (enabled_only,), prepare=True)
         rows = await cur.fetchall()
-    return [TaskDefinition(**row) for row in rows]
+    if generation == _definitions_generation:
+        _definitions_cache[enabled_only] = (time.monotonic() + DEFINITIONS_CACHE_TTL, rows)
+    return ORJSONResponse(content=rows)
 
 
 @definition_router.get("/{definition_id}", response_model=TaskDefinition)
 async def get_task_definition(
     definition_id: int,
     conn: AsyncConnection = Depends(connection)
-) -> TaskDefinition:
+):
     """Get a specific task definition"""
+    # Serve from the cached full definition list when it is fresh; the table
+    # is small, so a scan is cheaper than a round trip. Cached rows already
+    # have the TaskDefinition shape and go out as-is, like the list.
+    cached = _definitions_cache.get(False)
+    if cached and cached[0] > time.monotonic():
+        for row in cached[1]:
+            if row["id"] == definition_id:
+                return ORJSONResponse(content=row)
+
     async with conn.cursor(row_factory=dict_row) as cur:
-        await cur.execute(
-            "SELECT * FROM task_definitions WHERE id = %s",
-            (definition_id,)
-        )
-        row = await cur.fetchone()
-        if not row:
+        await cur.execute(GET_TASK_DEFINITION_SQL, (definition_id,), prepare=True)
+        definition = await cur.fetchone()
+        if not definition:
             raise HTTPException(status_code=404, detail="Task definition not found")
-    return TaskDefinition(**row)
+    return ORJSONResponse(content=definition)
 
 
 @definition_router.post("", response_model=TaskDefinition, status_code=status.HTTP_201_CREATED)
 async def create_task_definition(
     payload: TaskDefinitionCreate,
     conn: AsyncConnection = Depends(connection),
-) -> TaskDefinition:
+):
     """Create a new task definition"""
     # Validate
-    if payload.task_type not in TASK_TYPES:
+    if payload.task_type not in TASK_TYPES_SET:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid task_type. Must be one of: {TASK_TYPES}"
+            detail=INVALID_TASK_TYPE
         )
-    if payload.default_priority not in TASK_PRIORITIES:
+    if payload.default_priority not in TASK_PRIORITIES_SET:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid default_priority. Must be one of: {TASK_PRIORITIES}"
-        )
-
-    # Check for duplicate
-    async with conn.cursor(row_factory=dict_row) as cur:
-        await cur.execute(
-            "SELECT id FROM task_definitions WHERE alert_scenario = %s",
-            (payload.alert_scenario,)
+            detail=INVALID_DEFAULT_PRIORITY
         )
-        if await cur.fetchone():
-            raise HTTPException(
-                status_code=400,
-                detail="Task definition for this alert scenario already exists"
-            )
 
-    query = """
+    # uq_task_def_scenario rejects duplicates atomically; no row back means
+    # the scenario already has a definition
+    query = f"""
         INSERT INTO task_definitions (
             alert_scenario, alert_severity, task_type, default_priority,
             due_date_offset_hours, title_template, description_template,
             enabled, auto_start_workflow
         )
         VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        RETURNING *
+        ON CONFLICT (alert_scenario) DO NOTHING
+        RETURNING {TASK_DEFINITION_COLUMNS}
     """
     async with conn.cursor(row_factory=dict_row) as cur:
         await cur.execute(
@@ -897,8 +1632,15 @@ async def create_task_definition(
                 payload.auto_start_workflow,
             ),
         )
-        row = await cur.fetchone()
-    return TaskDefinition(**row)
+        definition = await cur.fetchone()
+        if not definition:
+            raise HTTPException(
+                status_code=400,
+                detail="Task definition for this alert scenario already exists"
+            )
+    await conn.commit()
+    _invalidate_definitions()
+    return ORJSONResponse(content=definition, status_code=status.HTTP_201_CREATED)
 
 
 @definition_router.patch("/{definition_id}", response_model=TaskDefinition)
@@ -906,49 +1648,32 @@ async def update_task_definition(
     definition_id: int,
     payload: TaskDefinitionUpdate,
     conn: AsyncConnection = Depends(connection),
-) -> TaskDefinition:
+):
     """Update a task definition"""
-    updates = {}
-    if payload.alert_severity is not None:
-        updates["alert_severity"] = payload.alert_severity
-    if payload.task_type is not None:
-        if payload.task_type not in TASK_TYPES:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid task_type. Must be one of: {TASK_TYPES}"
-            )
-        updates["task_type"] = payload.task_type
-    if payload.default_priority is not None:
-        if payload.default_priority not in TASK_PRIORITIES:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid default_priority. Must be one of: {TASK_PRIORITIES}"
-            )
-        updates["default_priority"] = payload.default_priority
-    if payload.due_date_offset_hours is not None:
-        updates["due_date_offset_hours"] = payload.due_date_offset_hours
-    if payload.title_template is not None:
-        updates["title_template"] = payload.title_template
-    if payload.description_template is not None:
-        updates["description_template"] = payload.description_template
-    if payload.enabled is not None:
-        updates["enabled"] = payload.enabled
-    if payload.auto_start_workflow is not None:
-        updates["auto_start_workflow"] = payload.auto_start_workflow
-
-    if not updates:
-        return await get_task_definition(definition_id, conn)
+    if payload.task_type is not None and payload.task_type not in TASK_TYPES_SET:
+        raise HTTPException(
+            status_code=400,
+            detail=INVALID_TASK_TYPE
+        )
+    if payload.default_priority is not None and payload.default_priority not in TASK_PRIORITIES_SET:
+        raise HTTPException(
+            status_code=400,
+            detail=INVALID_DEFAULT_PRIORITY
+        )
 
-    set_clause = ", ".join(f"{field} = %s" for field in updates.keys())
-    params = list(updates.values()) + [definition_id]
+    params = payload.model_dump()
+    if all(value is None for value in params.values()):
+        return await get_task_definition(definition_id, conn)
+    params["id"] = definition_id
 
-    query = f"UPDATE task_definitions SET {set_clause} WHERE id = %s RETURNING *"
     async with conn.cursor(row_factory=dict_row) as cur:
-        await cur.execute(query, params)
-        row = await cur.fetchone()
-        if not row:
+        await cur.execute(UPDATE_TASK_DEFINITION_SQL, params, prepare=True)
+        definition = await cur.fetchone()
+        if not definition:
             raise HTTPException(status_code=404, detail="Task definition not found")
-    return TaskDefinition(**row)
+    await conn.commit()
+    _invalidate_definitions()
+    return ORJSONResponse(content=definition)
 
 
 @definition_router.delete("/{definition_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -959,24 +1684,10 @@ async def delete_task_definition(
     """Delete a task definition"""
     async with conn.cursor() as cur:
         await cur.execute(
-            "DELETE FROM task_definitions WHERE id = %s RETURNING id",
+            "DELETE FROM task_definitions WHERE id = %s",
             (definition_id,)
         )
-        if not await cur.fetchone():
+        if cur.rowcount == 0:
             raise HTTPException(status_code=404, detail="Task definition not found")
-
-
-# =============================================================================
-# HELPER FUNCTIONS
-# =============================================================================
-
-def _serialize_task(row: dict) -> dict:
-    """Serialize task row for Pydantic model"""
-    data = dict(row)
-    # Convert UUID to string if present
-    if data.get("customer_id"):
-        data["customer_id"] = str(data["customer_id"])
-    # Ensure details is a dict
-    if data.get("details") is None:
-        data["details"] = {}
-    return data
+    await conn.commit()
+    _invalidate_definitions()
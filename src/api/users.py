@@ -5,16 +5,51 @@ from typing import Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from psycopg import AsyncConnection
+from psycopg.errors import UniqueViolation
 from psycopg.rows import dict_row
 
 from .config import settings
 from .db import connection
-from .models import User, UserCreate, UserUpdate, ResetPasswordRequest, USER_ROLES
-from .security import get_current_user, hash_password, require_role
+from .models import User, UserCreate, UserUpdate, ResetPasswordRequest, USER_ROLES, USER_ROLES_SET
+from .security import hash_password, require_admin
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+# Only the columns User exposes; password_hash and the lockout counters never
+# leave the database on these paths
+USER_COLUMNS = ", ".join(User.model_fields)
+
+INVALID_ROLE = f"Invalid role. Must be one of: {USER_ROLES}"
+
+# The projection is USER_COLUMNS and the table types match the model, so rows
+# are sent to the client as-is through ORJSONResponse; response_model only
+# documents the shape and FastAPI does not validate them again
+
+# One query text for every filter combination, so a single prepared plan
+# serves all list requests; unset filters are passed as NULL
+LIST_USERS_SQL = f"""
+    SELECT {USER_COLUMNS} FROM users
+    WHERE (%(role)s::text IS NULL OR role = %(role)s)
+      AND (%(is_active)s::boolean IS NULL OR is_active = %(is_active)s)
+    ORDER BY full_name ASC
+    LIMIT %(limit)s
+"""
+
+# PATCH semantics in one statement: NULL parameters keep the current value, so
+# every patch shape shares one query text and one prepared plan
+UPDATE_USER_SQL = f"""
+    UPDATE users
+    SET email = COALESCE(%(email)s::text, email),
+        full_name = COALESCE(%(full_name)s::text, full_name),
+        role = COALESCE(%(role)s::text, role),
+        is_active = COALESCE(%(is_active)s::boolean, is_active)
+    WHERE id = %(id)s
+    RETURNING {USER_COLUMNS}
+"""
+
 
 @router.get("", response_model=list[User])
 async def list_users(
@@ -22,81 +57,60 @@ async def list_users(
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
     limit: int = Query(100, le=500),
     conn: AsyncConnection = Depends(connection),
-) -> list[User]:
+):
     """List all users with optional filters"""
-    conditions = []
-    params = []
-
-    if role:
-        if role not in USER_ROLES:
-            raise HTTPException(status_code=400, detail=f"Invalid role. Must be one of: {USER_ROLES}")
-        conditions.append("role = %s")
-        params.append(role)
-
-    if is_active is not None:
-        conditions.append("is_active = %s")
-        params.append(is_active)
-
-    where_clause = " AND ".join(conditions) if conditions else "1=1"
-    params.append(limit)
+    if role and role not in USER_ROLES_SET:
+        raise HTTPException(status_code=400, detail=INVALID_ROLE)
 
+    params = {"role": role or None, "is_active": is_active, "limit": limit}
     async with conn.cursor(row_factory=dict_row) as cur:
-        await cur.execute(
-            f"""
-            SELECT * FROM users
-            WHERE {where_clause}
-            ORDER BY full_name ASC
-            LIMIT %s
-            """,
-            params,
-        )
-        rows = await cur.fetchall()
-        return [User(**row) for row in rows]
+        await cur.execute(LIST_USERS_SQL, params, prepare=True)
+        return ORJSONResponse(content=await cur.fetchall())
 
 
 @router.get("/{user_id}", response_model=User)
 async def get_user(
     user_id: UUID,
     conn: AsyncConnection = Depends(connection),
-) -> User:
+):
     """Get a specific user by ID"""
     async with conn.cursor(row_factory=dict_row) as cur:
         await cur.execute(
-            "SELECT * FROM users WHERE id = %s",
+            f"SELECT {USER_COLUMNS} FROM users WHERE id = %s",
             (str(user_id),),
         )
         row = await cur.fetchone()
         if not row:
             raise HTTPException(status_code=404, detail="User not found")
-        return User(**row)
+        return ORJSONResponse(content=row)
 
 
 @router.get("/by-email/{email}", response_model=User)
 async def get_user_by_email(
     email: str,
     conn: AsyncConnection = Depends(connection),
-) -> User:
+):
     """Get a user by email address"""
     async with conn.cursor(row_factory=dict_row) as cur:
         await cur.execute(
-            "SELECT * FROM users WHERE email = %s",
+            f"SELECT {USER_COLUMNS} FROM users WHERE email = %s",
             (email,),
         )
         row = await cur.fetchone()
         if not row:
             raise HTTPException(status_code=404, detail="User not found")
-        return User(**row)
+        return ORJSONResponse(content=row)
 
 
 @router.post("", response_model=User, status_code=201)
 async def create_user(
     payload: UserCreate,
-    current_user: dict = Depends(require_role("admin")),
+    current_user: dict = Depends(require_admin()),
     conn: AsyncConnection = Depends(connection),
-) -> User:
+):
     """Create a new user (admin only)"""
-    if payload.role not in USER_ROLES:
-        raise HTTPException(status_code=400, detail=f"Invalid role. Must be one of: {USER_ROLES}")
+    if payload.role not in USER_ROLES_SET:
+        raise HTTPException(status_code=400, detail=INVALID_ROLE)
 
     # Validate password
     if len(payload.password) < settings.password_min_length:
@@ -105,30 +119,34 @@ async def create_user(
             detail=f"Password must be at least {settings.password_min_length} characters",
         )
 
-    async with conn.cursor(row_factory=dict_row) as cur:
-        # Check if email already exists
-        await cur.execute(
-            "SELECT id FROM users WHERE email = %s",
-            (payload.email,),
-        )
+    # Reject a taken email before paying for the hash, so repeated duplicate
+    # requests cannot tie up the threadpool
+    async with conn.cursor() as cur:
+        await cur.execute("SELECT 1 FROM users WHERE email = %s", (payload.email,))
         if await cur.fetchone():
             raise HTTPException(status_code=400, detail="User with this email already exists")
 
-        # Hash password
-        password_hash = hash_password(payload.password)
+    # bcrypt is deliberately slow; hash in the threadpool so the event loop
+    # keeps serving other requests
+    password_hash = await run_in_threadpool(hash_password, payload.password)
 
-        # Create user
+    async with conn.cursor(row_factory=dict_row) as cur:
+        # Create user; the unique email constraint still rejects a duplicate
+        # created concurrently
         await cur.execute(
-            """
+            f"""
             INSERT INTO users (email, full_name, role, password_hash)
             VALUES (%s, %s, %s, %s)
-            RETURNING id, email, full_name, role, is_active, created_at, updated_at
+            ON CONFLICT (email) DO NOTHING
+            RETURNING {USER_COLUMNS}
             """,
             (payload.email, payload.full_name, payload.role, password_hash),
         )
         row = await cur.fetchone()
+        if not row:
+            raise HTTPException(status_code=400, detail="User with this email already exists")
         await conn.commit()
-        return User(**row)
+        return ORJSONResponse(content=row, status_code=201)
 
 
 @router.patch("/{user_id}", response_model=User)
@@ -136,63 +154,34 @@ async def update_user(
     user_id: UUID,
     payload: UserUpdate,
     conn: AsyncConnection = Depends(connection),
-) -> User:
+):
     """Update a user"""
-    if payload.role and payload.role not in USER_ROLES:
-        raise HTTPException(status_code=400, detail=f"Invalid role. Must be one of: {USER_ROLES}")
-
-    async with conn.cursor(row_factory=dict_row) as cur:
-        # Check user exists
-        await cur.execute(
-            "SELECT * FROM users WHERE id = %s",
-            (str(user_id),),
-        )
-        user = await cur.fetchone()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        # Check email uniqueness if being changed
-        if payload.email and payload.email != user["email"]:
-            await cur.execute(
-                "SELECT id FROM users WHERE email = %s AND id != %s",
-                (payload.email, str(user_id)),
-            )
-            if await cur.fetchone():
-                raise HTTPException(status_code=400, detail="Email already in use")
+    if payload.role and payload.role not in USER_ROLES_SET:
+        raise HTTPException(status_code=400, detail=INVALID_ROLE)
 
-        # Build update query
-        updates = []
-        params = []
-        update_data = payload.model_dump(exclude_unset=True)
+    params = payload.model_dump()
+    if all(value is None for value in params.values()):
+        return await get_user(user_id, conn)
+    params["id"] = str(user_id)
 
-        for key, value in update_data.items():
-            if value is not None:
-                updates.append(f"{key} = %s")
-                params.append(value)
-
-        if not updates:
-            return User(**user)
-
-        params.append(str(user_id))
-
-        await cur.execute(
-            f"""
-            UPDATE users
-            SET {", ".join(updates)}
-            WHERE id = %s
-            RETURNING *
-            """,
-            params,
-        )
+    async with conn.cursor(row_factory=dict_row) as cur:
+        # A missing user updates no row; a taken email violates the unique
+        # constraint. Neither needs a lookup first.
+        try:
+            await cur.execute(UPDATE_USER_SQL, params, prepare=True)
+        except UniqueViolation:
+            raise HTTPException(status_code=400, detail="Email already in use")
         row = await cur.fetchone()
+        if not row:
+            raise HTTPException(status_code=404, detail="User not found")
         await conn.commit()
-        return User(**row)
+        return ORJSONResponse(content=row)
 
 
 @router.delete("/{user_id}", status_code=204)
 async def deactivate_user(
     user_id: UUID,
-    current_user: dict = Depends(require_role("admin")),
+    current_user: dict = Depends(require_admin()),
     conn: AsyncConnection = Depends(connection),
 ):
     """Deactivate a user (soft delete, admin only)"""
@@ -200,18 +189,13 @@ async def deactivate_user(
     if str(user_id) == str(current_user["id"]):
         raise HTTPException(status_code=400, detail="Cannot deactivate your own account")
 
-    async with conn.cursor(row_factory=dict_row) as cur:
-        await cur.execute(
-            "SELECT id FROM users WHERE id = %s",
-            (str(user_id),),
-        )
-        if not await cur.fetchone():
-            raise HTTPException(status_code=404, detail="User not found")
-
+    async with conn.cursor() as cur:
         await cur.execute(
             "UPDATE users SET is_active = FALSE WHERE id = %s",
             (str(user_id),),
         )
+        if cur.rowcount == 0:
+            raise HTTPException(status_code=404, detail="User not found")
         await conn.commit()
 
 
@@ -219,7 +203,7 @@ async def deactivate_user(
 async def reset_user_password(
     user_id: UUID,
     payload: ResetPasswordRequest,
-    current_user: dict = Depends(require_role("admin")),
+    current_user: dict = Depends(require_admin()),
     conn: AsyncConnection = Depends(connection),
 ):
     """Reset a user's password (admin only)"""
@@ -230,36 +214,33 @@ async def reset_user_password(
             detail=f"Password must be at least {settings.password_min_length} characters",
         )
 
-    async with conn.cursor(row_factory=dict_row) as cur:
-        # Check user exists
-        await cur.execute(
-            "SELECT id FROM users WHERE id = %s",
-            (str(user_id),),
-        )
-        if not await cur.fetchone():
-            raise HTTPException(status_code=404, detail="User not found")
-
-        # Hash and update password
-        password_hash = hash_password(payload.new_password)
-
-        await cur.execute(
-            """
-            UPDATE users
-            SET password_hash = %s, failed_attempts = 0, locked_until = NULL, updated_at = NOW()
-            WHERE id = %s
-            """,
-            (password_hash, str(user_id)),
-        )
+    # Hash password (off the event loop)
+    password_hash = await run_in_threadpool(hash_password, payload.new_password)
 
-        # Revoke all refresh tokens (force re-login)
-        await cur.execute(
-            """
-            UPDATE refresh_tokens
-            SET revoked_at = NOW()
-            WHERE user_id = %s AND revoked_at IS NULL
-            """,
-            (str(user_id),),
-        )
+    # Both updates go to the server in one pipelined round trip. If the user
+    # does not exist the token update touches nothing and is rolled back with
+    # the 404.
+    async with conn.cursor() as cur, conn.cursor() as tokens_cur:
+        async with conn.pipeline():
+            await cur.execute(
+                """
+                UPDATE users
+                SET password_hash = %s, failed_attempts = 0, locked_until = NULL, updated_at = NOW()
+                WHERE id = %s
+                """,
+                (password_hash, str(user_id)),
+            )
+            # Revoke all refresh tokens (force re-login)
+            await tokens_cur.execute(
+                """
+                UPDATE refresh_tokens
+                SET revoked_at = NOW()
+                WHERE user_id = %s AND revoked_at IS NULL
+                """,
+                (str(user_id),),
+            )
+        if cur.rowcount == 0:
+            raise HTTPException(status_code=404, detail="User not found")
         await conn.commit()
 
     return {"message": "Password reset successfully"}
@@ -10,7 +10,7 @@ from temporalio.client import Client
 from temporalio.worker import Worker
 
 from src.api.config import settings
-from src.api.db import get_pool
+from src.api.db import get_pool, open_pool
 
 logger = logging.getLogger(__name__)
 
@@ -1062,6 +1062,9 @@ class AlertLifecycleWorkflow:
 
 async def run_worker() -> None:
     """Run the Temporal worker"""
+    # Establish the pool's connections before polling, so the first
+    # activities do not each pay for a new connection
+    await open_pool()
     client = await Client.connect(f"{settings.temporal_host}:{settings.temporal_port}")
     worker = Worker(
         client,